@@ -16,6 +16,7 @@ class Database:
         if cls._instance is None:
             cls._instance = super(Database, cls).__new__(cls)
             cls._instance.connection = None
+            cls._instance._schedule_listeners = []
         return cls._instance
 
     def __init__(self, db_path=None):
@@ -39,12 +40,26 @@ class Database:
             # Create the directory if it doesn't exist
             Path(db_path).parent.mkdir(parents=True, exist_ok=True)
             
-            # Connect to the database with row factory for dict-like results
-            self.connection = sqlite3.connect(db_path)
+            # Connect to the database with row factory for dict-like results;
+            # a larger statement cache keeps repeated queries pre-compiled
+            self.connection = sqlite3.connect(db_path, cached_statements=256)
             self.connection.row_factory = sqlite3.Row
             
             # Enable foreign keys
             self.connection.execute("PRAGMA foreign_keys = ON")
+
+            # Performance pragmas: WAL lets readers proceed during writes and
+            # NORMAL sync is durable enough in WAL mode
+            journal_mode = self.connection.execute(
+                "PRAGMA journal_mode = WAL"
+            ).fetchone()[0]
+            if journal_mode != "wal":
+                # e.g. network filesystems; commits then fsync the rollback journal
+                logging.warning(f"WAL unavailable, using journal_mode={journal_mode}")
+            self.connection.execute("PRAGMA synchronous = NORMAL")
+            self.connection.execute("PRAGMA cache_size = -64000")  # ~64 MB
+            self.connection.execute("PRAGMA temp_store = MEMORY")
+            self.connection.execute("PRAGMA mmap_size = 268435456")  # 256 MB
             
             # Run schema migration to ensure all columns exist
             self.migrate_schema()
@@ -98,7 +113,8 @@ class Database:
             """
             )
 
-            # Class Enrollments table
+            # Class Enrollments table; the UNIQUE(class_id, student_id) index
+            # also serves every per-class enrollment lookup and join
             cursor.execute(
                 """
             CREATE TABLE IF NOT EXISTS class_enrollments (
@@ -178,6 +194,71 @@ class Database:
             )
             """)
 
+            # Student face encodings table (raw float32 bytes), with the image
+            # file each encoding was computed from. Kept apart from
+            # students.face_encoding, which holds base64 float64 text for
+            # FaceRecognitionManager.
+            cursor.execute(
+                """
+            CREATE TABLE IF NOT EXISTS student_encodings (
+                student_id TEXT PRIMARY KEY,
+                encoding BLOB NOT NULL,
+                face_image_path TEXT,
+                face_image_mtime REAL,
+                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (student_id) REFERENCES students (student_id)
+                    ON DELETE CASCADE
+            )
+            """
+            )
+
+            # Encodings stored before their source was recorded have no path,
+            # so they are recomputed on the next camera start
+            cursor.execute("PRAGMA table_info(student_encodings)")
+            encoding_columns = {column[1] for column in cursor.fetchall()}
+            for column, column_type in (
+                ("face_image_path", "TEXT"),
+                ("face_image_mtime", "REAL"),
+            ):
+                if column not in encoding_columns:
+                    logging.info(f"Adding '{column}' column to student_encodings table")
+                    cursor.execute(
+                        f"ALTER TABLE student_encodings "
+                        f"ADD COLUMN {column} {column_type}"
+                    )
+
+            # Index for per-class, per-day attendance lookups
+            cursor.execute(
+                """
+            CREATE INDEX IF NOT EXISTS idx_attendance_class_checkin
+            ON attendance (class_id, check_in_time)
+            """
+            )
+
+            # Index so class lists sorted by name avoid a temp B-tree sort
+            cursor.execute(
+                """
+            CREATE INDEX IF NOT EXISTS idx_classes_name
+            ON classes (name)
+            """
+            )
+
+            # Index so the newest-first class list is read in order, unsorted
+            cursor.execute(
+                """
+            CREATE INDEX IF NOT EXISTS idx_classes_created_at
+            ON classes (created_at DESC)
+            """
+            )
+
+            # Index for fetching a class's schedules by class_id
+            cursor.execute(
+                """
+            CREATE INDEX IF NOT EXISTS idx_schedules_class_id
+            ON class_schedules (class_id)
+            """
+            )
+
             # Commit transaction
             self.connection.commit()
 
@@ -206,12 +287,7 @@ class Database:
     def execute(self, query, params=None):
         """Execute a query and return the cursor."""
         try:
-            cursor = self.connection.cursor()
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            return cursor
+            return self.connection.execute(query, params or ())
         except sqlite3.Error as e:
             logging.error(f"Database execution error: {e}")
             logging.error(f"Query: {query}")
@@ -227,6 +303,15 @@ class Database:
         """Rollback the current transaction."""
         self.connection.rollback()
 
+    def add_schedules_listener(self, callback):
+        """Call callback() after class schedules are written."""
+        self._schedule_listeners.append(callback)
+
+    def notify_schedules_changed(self):
+        """Tell listeners that class schedules were written and committed."""
+        for callback in self._schedule_listeners:
+            callback()
+
     # Student operations
     def add_student(self, student_data):
         """
@@ -425,6 +510,33 @@ class Database:
             logging.error(f"Unexpected error in get_students: {e}")
             return []
 
+    def get_students_with_enrollment(self, class_id):
+        """
+        Retrieve all students, flagging those already enrolled in a class.
+
+        :param class_id: ID of the class to check enrollment against
+        :return: List of (student_id, full_name, email, gender, enrolled) rows
+        """
+        try:
+            return self.connection.execute(
+                """
+                SELECT
+                    s.student_id,
+                    TRIM(IFNULL(s.first_name, '') || ' ' || IFNULL(s.last_name, '')),
+                    IFNULL(s.email, ''),
+                    IFNULL(s.gender, ''),
+                    ce.student_id IS NOT NULL AS enrolled
+                FROM students s
+                LEFT JOIN class_enrollments ce
+                    ON ce.student_id = s.student_id AND ce.class_id = ?
+                ORDER BY s.created_at DESC
+                """,
+                (class_id,),
+            ).fetchall()
+        except sqlite3.Error as e:
+            logging.error(f"Database error in get_students_with_enrollment: {e}")
+            return []
+
     def get_student(self, student_id):
         """Get student details by ID with expanded fields."""
         cursor = self.execute(
@@ -595,6 +707,41 @@ class Database:
             logging.error(traceback.format_exc())
             raise
 
+    # Face encoding operations
+    def get_face_encodings(self):
+        """
+        Get all stored face encodings as (student_id, encoding,
+        face_image_path, face_image_mtime) rows.
+        """
+        cursor = self.execute(
+            """
+            SELECT student_id, encoding, face_image_path, face_image_mtime
+            FROM student_encodings
+        """
+        )
+        return cursor.fetchall()
+
+    def save_face_encoding(
+        self, student_id, encoding, face_image_path, face_image_mtime
+    ):
+        """
+        Store or replace the face encoding for a student.
+
+        :param student_id: Unique identifier of the student
+        :param encoding: Raw encoding bytes (float32 array ``tobytes()``)
+        :param face_image_path: Image file the encoding was computed from
+        :param face_image_mtime: Modification time of that file
+        """
+        self.execute(
+            """
+            INSERT OR REPLACE INTO student_encodings
+            (student_id, encoding, face_image_path, face_image_mtime, updated_at)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """,
+            (student_id, sqlite3.Binary(encoding), face_image_path, face_image_mtime),
+        )
+        self.commit()
+
     # Class operations
     def add_class(
         self,
@@ -668,6 +815,7 @@ class Database:
 
             # Commit the transaction
             self.connection.commit()
+            self.notify_schedules_changed()
 
             return class_id
 
@@ -861,6 +1009,7 @@ class Database:
 
             # Commit the transaction
             self.connection.commit()
+            self.notify_schedules_changed()
 
             return True
 
@@ -975,6 +1124,7 @@ class Database:
 
             # Commit transaction
             self.connection.commit()
+            self.notify_schedules_changed()
 
             return cursor.lastrowid
 
@@ -1036,6 +1186,8 @@ class Database:
         :param class_id: ID of the class
         :param date: Date string in format 'YYYY-MM-DD'
         :return: List of attendance records
+        :raises sqlite3.Error: If the query fails, so callers can tell a failed
+            read from a day with no records
         """
         try:
             cursor = self.connection.cursor()
@@ -1055,8 +1207,11 @@ class Database:
             params = [class_id]
 
             if date:
-                query += " AND date(a.check_in_time) = ?"
-                params.append(date)
+                # Range on the raw column so idx_attendance_class_checkin applies
+                query += (
+                    " AND a.check_in_time >= ? AND a.check_in_time < date(?, '+1 day')"
+                )
+                params.extend([date, date])
 
             query += " ORDER BY a.check_in_time DESC"
 
@@ -1080,7 +1235,7 @@ class Database:
 
         except sqlite3.Error as e:
             logging.error(f"Error getting attendance records: {e}")
-            return []
+            raise
 
     # Attendance operations
     def mark_attendance(
@@ -1131,6 +1286,31 @@ class Database:
             logging.error(f"Error marking attendance: {e}")
             raise ValueError(f"Could not mark attendance: {e}")
 
+    def mark_attendance_many(self, rows):
+        """
+        Mark attendance for several students in a single transaction.
+
+        :param rows: List of (class_id, student_id, status, check_in_time, notes) tuples
+        :return: Number of attendance records inserted
+        """
+        try:
+            with self.connection:
+                cursor = self.connection.executemany(
+                    """
+                    INSERT INTO attendance
+                    (class_id, student_id, status, check_in_time, notes)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    rows,
+                )
+
+            logging.info(f"Marked attendance for {cursor.rowcount} students")
+            return cursor.rowcount
+
+        except sqlite3.Error as e:
+            logging.error(f"Error marking attendance batch: {e}")
+            raise ValueError(f"Could not mark attendance: {e}")
+
     def get_student_attendance(self, student_id, class_id=None):
         """Get attendance records for a student."""
         if class_id:
@@ -1254,6 +1434,31 @@ class Database:
         )
         self.commit()
 
+    def record_behaviors_many(self, rows):
+        """
+        Record several behavior observations in a single transaction.
+
+        :param rows: List of (class_id, student_id, behavior_type, behavior_value, timestamp) tuples
+        :return: Number of behavior records inserted
+        """
+        try:
+            with self.connection:
+                cursor = self.connection.executemany(
+                    """
+                    INSERT INTO behavior_records
+                    (class_id, student_id, behavior_type, behavior_value, timestamp)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    rows,
+                )
+
+            logging.info(f"Recorded {cursor.rowcount} behavior observations")
+            return cursor.rowcount
+
+        except sqlite3.Error as e:
+            logging.error(f"Error recording behavior batch: {e}")
+            raise ValueError(f"Could not record behaviors: {e}")
+
     def get_student_behaviors(self, student_id, class_id=None, behavior_type=None):
         """Get behavior records for a student."""
         query = "SELECT * FROM behavior_records WHERE student_id = ?"
@@ -228,3 +228,22 @@ class FaceRecognitionManager:
         except Exception as e:
             logging.error(f"Error adding student face: {e}")
             return False
+
+
+def encode_face_image(face_image_path):
+    """
+    Compute the face encoding of a stored face image
+
+    Takes about half a second per image, so callers run it off the UI thread.
+
+    :param face_image_path: Path to the student's face image
+    :return: (encoding, mtime) with the float32 encoding of the first face, or
+        None when no face is found, and the file's modification time read
+        before decoding
+    """
+    face_image_mtime = os.path.getmtime(face_image_path)
+    image = face_recognition.load_image_file(face_image_path)
+    face_encodings = face_recognition.face_encodings(image)
+    if not face_encodings:
+        return None, face_image_mtime
+    return np.asarray(face_encodings[0], dtype=np.float32), face_image_mtime
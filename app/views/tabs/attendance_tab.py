@@ -1,15 +1,16 @@
 import os
 import cv2
+import numpy as np
 import logging
-import sqlite3
-from datetime import datetime
+import face_recognition
+from datetime import datetime, timedelta
 from PyQt6.QtWidgets import (
     QWidget,
     QVBoxLayout,
     QHBoxLayout,
     QLabel,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
+    QHeaderView,
     QPushButton,
     QComboBox,
     QDateEdit,
@@ -23,23 +24,284 @@ from PyQt6.QtWidgets import (
     QSpinBox,
 )
 from PyQt6.QtGui import QFont, QColor, QIcon, QImage, QPixmap
-from PyQt6.QtCore import Qt, QDate, QTimer
+from PyQt6.QtCore import (
+    Qt,
+    QDate,
+    QTimer,
+    QAbstractTableModel,
+    QModelIndex,
+    QObject,
+    QThread,
+    pyqtSignal,
+    pyqtSlot,
+)
+
+# Optional ANN index for face matching; falls back to the NumPy scan
+try:
+    import faiss
+except ImportError:
+    faiss = None
 
 from app.models.database import Database
-from app.utils.face_recognition import FaceRecognitionManager
+from app.utils.face_recognition import FaceRecognitionManager, encode_face_image
 from app.utils.config import DATA_DIR, ICONS_DIR
 
 
+class AttendanceTableModel(QAbstractTableModel):
+    """Table model backed directly by the attendance record dictionaries."""
+
+    HEADERS = ["Student ID", "Name", "Check-in Time", "Status", "Location", "Notes"]
+    KEYS = ["student_id", "name", "check_in_time", "status", "location", "notes"]
+    STATUS_COLUMN = 3
+    NOTES_COLUMN = 5
+
+    # Shared status cell backgrounds, returned by reference for every row
+    _STATUS_COLORS = {
+        "Present": QColor(200, 255, 200),  # Light green
+        "Absent": QColor(255, 200, 200),  # Light red
+        "Late": QColor(255, 255, 200),  # Light yellow
+    }
+
+    # Emitted with (attendance_id, notes) after the user edits a note
+    notes_edited = pyqtSignal(object, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._records = []
+        self._date_str = ""
+
+    def set_records(self, records, date_str=""):
+        """Replace the model contents with a single reset"""
+        # Clearing an already empty table would only force a relayout
+        if not records and not self._records:
+            self._date_str = date_str
+            return
+
+        self.beginResetModel()
+        self._records = list(records)
+        self._date_str = date_str
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._records)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if (
+            role == Qt.ItemDataRole.DisplayRole
+            and orientation == Qt.Orientation.Horizontal
+        ):
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        record = self._records[index.row()]
+        column = index.column()
+
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            if column == 2:
+                return self._format_check_in(record.get("check_in_time") or "")
+            value = record.get(self.KEYS[column])
+            return "" if value is None else str(value)
+
+        if role == Qt.ItemDataRole.BackgroundRole and column == self.STATUS_COLUMN:
+            return self._STATUS_COLORS.get(record.get("status"))
+
+        if role == Qt.ItemDataRole.UserRole:
+            # Attendance ID, used when editing notes
+            return record.get("id")
+
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid() and index.column() == self.NOTES_COLUMN:
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if (
+            role != Qt.ItemDataRole.EditRole
+            or not index.isValid()
+            or index.column() != self.NOTES_COLUMN
+        ):
+            return False
+
+        record = self._records[index.row()]
+        record["notes"] = value
+        self.dataChanged.emit(index, index, [role])
+        self.notes_edited.emit(record.get("id"), value)
+        return True
+
+    def _format_check_in(self, check_in_time):
+        """Show only the time for records on the selected day"""
+        if len(check_in_time) > 16:  # If full timestamp
+            date_part = check_in_time[:10]  # YYYY-MM-DD
+            time_part = check_in_time[11:16]  # HH:MM
+            if self._date_str == date_part:
+                return time_part
+            return f"{date_part} {time_part}"
+        return check_in_time
+
+
+class FaceWorker(QObject):
+    """Runs face detection, encoding and matching off the UI thread."""
+
+    # List of (student_id, name, confidence, (top, right, bottom, left)) in
+    # full-frame coordinates; emitted once per processed frame, even if empty
+    matched = pyqtSignal(list)
+
+    # List of (student_id, encoding bytes, face_image_path, face_image_mtime)
+    # for faces encoded by encode_faces, to be stored by the UI thread
+    encoded = pyqtSignal(list)
+
+    def __init__(self, face_cascade, match_face, add_known, detection_scale):
+        super().__init__()
+        self.face_cascade = face_cascade
+        self.match_face = match_face
+        self.add_known = add_known
+        self.detection_scale = detection_scale
+
+    @pyqtSlot(list)
+    def encode_faces(self, students):
+        """Encode (student_id, name, face_image_path) images with no stored encoding"""
+        ids = []
+        names = []
+        encodings = []
+        stored = []
+        for student_id, name, face_path in students:
+            try:
+                encoding, mtime = encode_face_image(face_path)
+            except Exception as face_error:
+                logging.error(
+                    f"Error encoding face image for student {student_id}: {face_error}"
+                )
+                continue
+
+            if encoding is None:
+                continue
+
+            ids.append(student_id)
+            names.append(name)
+            encodings.append(encoding)
+            stored.append((student_id, encoding.tobytes(), face_path, mtime))
+
+        if ids:
+            # Matching also runs on this thread, so the known faces can grow here
+            self.add_known(ids, names, encodings)
+            self.encoded.emit(stored)
+
+    @pyqtSlot(object)
+    def process(self, frame):
+        results = []
+        try:
+            # Detect on a downscaled copy; cost scales with pixel count
+            small_frame = cv2.resize(
+                frame, (0, 0), fx=self.detection_scale, fy=self.detection_scale
+            )
+            rgb_small = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
+
+            # Find faces with OpenCV's Haar cascade; dlib is only used for encoding
+            gray_small = cv2.cvtColor(small_frame, cv2.COLOR_BGR2GRAY)
+            faces = self.face_cascade.detectMultiScale(gray_small, 1.2, 5)
+
+            # Convert (x, y, w, h) to dlib's (top, right, bottom, left)
+            face_locations = [
+                (int(y), int(x + w), int(y + h), int(x)) for (x, y, w, h) in faces
+            ]
+
+            if face_locations:
+                face_encodings = face_recognition.face_encodings(
+                    rgb_small, face_locations
+                )
+                for face_location, face_encoding in zip(face_locations, face_encodings):
+                    student_id, name, confidence = self.match_face(face_encoding)
+                    # Scale the box back up to the full-resolution frame
+                    bbox = tuple(
+                        int(coord / self.detection_scale) for coord in face_location
+                    )
+                    results.append((student_id, name, confidence, bbox))
+
+        except Exception as e:
+            logging.error(f"Error in face worker: {e}")
+
+        self.matched.emit(results)
+
+
 class AttendanceTab(QWidget):
+    # Hands a frame to the FaceWorker thread
+    work_requested = pyqtSignal(object)
+
+    # Hands students whose face still needs encoding to the FaceWorker thread
+    encode_requested = pyqtSignal(list)
+
+    # Fraction of the camera resolution used for face detection
+    DETECTION_SCALE = 0.25
+
+    # Number of (class, date) attendance reads kept in memory
+    RECORDS_CACHE_SIZE = 128
+
+    # Largest mean 80x60 grayscale frame difference since the last detection
+    # below which detection is skipped
+    MOTION_THRESHOLD = 3.0
+
+    # While the last detection left a face unmatched or below MIN_CONFIDENCE,
+    # a still scene is re-checked every FORCE_DETECT_EVERY-th sample (seconds)
+    FORCE_DETECT_EVERY = 3
+
+    # Matches at or below this confidence are not checked in
+    MIN_CONFIDENCE = 0.6
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
         # Database and face recognition
         self.db = Database()
+        self._checked_in_today = set()
+
+        # Parsed schedule start times per class; cleared on class change,
+        # refresh, and whenever schedules are saved
+        self._schedule_cache = {}
+        self.db.add_schedules_listener(self._schedule_cache.clear)
+
+        # Successful attendance reads keyed on (class_id, date); cleared on writes
+        self._records_cache = {}
         self.face_recognition_manager = FaceRecognitionManager(
             os.path.join(DATA_DIR, "edison_vision.db")
         )
 
+        # Reused buffer and target size for the live camera preview
+        self._rgb_buf = None
+        self._display_size = None
+
+        # OpenCV face detector, loaded when the camera first starts
+        self.face_cascade = None
+
+        # Known face encodings (one row per student), built at camera start
+        self.known_ids = []
+        self.known_names = []
+        self.known_matrix = np.empty((0, 128), dtype=np.float32)
+        self.known_q = np.empty((0, 128), dtype=np.int8)
+        self._known_q_sq = np.empty(0, dtype=np.int32)
+        self._q_scale = 1.0
+        self._faiss_index = None
+
+        # Background face worker, created per camera session
+        self._face_thread = None
+        self._face_worker = None
+        self._worker_busy = False
+        self._camera_class_id = None
+        self._overlays = []
+        self._prev_gray = None
+        self._motion = 0.0
+        self._idle_samples = 0
+        self._unresolved_faces = False
+
         # Initialize UI
         self.init_ui()
 
@@ -57,6 +319,9 @@ class AttendanceTab(QWidget):
         self.class_selector = QComboBox()
         self.class_selector.addItem("Select Class")
         self.class_selector.currentIndexChanged.connect(self.load_attendance_records)
+        self.class_selector.currentIndexChanged.connect(
+            lambda _index: self._schedule_cache.clear()
+        )
 
         # Add refresh button for classes
         refresh_btn = QPushButton("↻")
@@ -107,6 +372,12 @@ class AttendanceTab(QWidget):
 
         main_layout.addLayout(actions_layout)
 
+        # Camera preview row, filled while face check-in is running
+        self.camera_layout = QHBoxLayout()
+        self.camera_layout.addStretch()
+        self.camera_layout.addStretch()
+        main_layout.addLayout(self.camera_layout)
+
         # Add status label
         self.status_label = QLabel("No records loaded")
         self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -114,23 +385,28 @@ class AttendanceTab(QWidget):
         main_layout.addWidget(self.status_label)
 
         # Attendance Table
-        self.attendance_table = QTableWidget()
-        self.attendance_table.setColumnCount(6)
-        self.attendance_table.setHorizontalHeaderLabels(
-            ["Student ID", "Name", "Check-in Time", "Status", "Location", "Notes"]
-        )
-        self.attendance_table.horizontalHeader().setStretchLastSection(True)
+        self.attendance_model = AttendanceTableModel(self)
+        self.attendance_model.notes_edited.connect(self.on_attendance_notes_edited)
+
+        self.attendance_table = QTableView()
+        self.attendance_table.setModel(self.attendance_model)
         self.attendance_table.setAlternatingRowColors(True)
+        self.attendance_table.setSelectionBehavior(
+            QTableView.SelectionBehavior.SelectRows
+        )
+
+        # Fixed column widths instead of measuring every row's contents
+        header = self.attendance_table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        header.setDefaultSectionSize(140)
+        header.setStretchLastSection(True)
 
-        # Make the Notes column editable
+        # Only the Notes column is editable (see AttendanceTableModel.flags)
         self.attendance_table.setEditTriggers(
-            QTableWidget.EditTrigger.DoubleClicked
-            | QTableWidget.EditTrigger.EditKeyPressed
+            QTableView.EditTrigger.DoubleClicked
+            | QTableView.EditTrigger.EditKeyPressed
         )
 
-        # Connect cell change signal to update notes in database
-        self.attendance_table.cellChanged.connect(self.on_attendance_cell_changed)
-
         main_layout.addWidget(self.attendance_table)
 
         self.setLayout(main_layout)
@@ -159,7 +435,7 @@ class AttendanceTab(QWidget):
             QPushButton:hover {
                 background-color: #45a049;
             }
-            QTableWidget {
+            QTableView {
                 alternate-background-color: #f2f2f2;
                 selection-background-color: #a6a6a6;
             }
@@ -171,55 +447,61 @@ class AttendanceTab(QWidget):
 
     def load_classes(self):
         try:
-            # Log that we're trying to load classes
-            logging.info("Loading classes into dropdown...")
+            # Explicit refresh: drop any memoized attendance reads and schedules
+            self._records_cache.clear()
+            self._schedule_cache.clear()
 
             # Get classes from database
             classes = self.db.get_classes()
 
-            # Clear existing items in dropdown
-            self.class_selector.clear()
-            self.class_selector.addItem("Select Class", None)
+            # sqlite3.Row and plain tuples both index positionally
+            class_ids = [cls[0] for cls in classes]
+            labels = [f"{cls[0]} - {cls[1]}" for cls in classes]
 
-            if not classes or len(classes) == 0:
+            # Repopulate in one batch without firing a signal per item
+            self.class_selector.blockSignals(True)
+            try:
+                self.class_selector.clear()
+                self.class_selector.addItem("Select Class", None)
+                self.class_selector.addItems(labels)
+                for index, class_id in enumerate(class_ids, start=1):
+                    self.class_selector.setItemData(index, class_id)
+            finally:
+                self.class_selector.blockSignals(False)
+
+            if not class_ids:
                 logging.warning("No classes found in database")
-                return
-
-            # Add each class to dropdown
-            class_count = 0
-            for cls in classes:
-                try:
-                    # Try to get class_id and name safely
-                    if isinstance(cls, sqlite3.Row):
-                        class_id = cls["class_id"]
-                        class_name = cls["name"]
-                    else:
-                        # Assume it's a tuple-like
-                        class_id = cls[0]
-                        class_name = cls[1]
-
-                    # Log what we're adding
-                    logging.info(f"Adding class to dropdown: {class_id} - {class_name}")
-
-                    # Add to dropdown
-                    self.class_selector.addItem(f"{class_id} - {class_name}", class_id)
-                    class_count += 1
-                except Exception as item_error:
-                    logging.error(f"Error adding class to dropdown: {str(item_error)}")
-                    continue
+            else:
+                logging.info(f"Added {len(class_ids)} classes to dropdown")
 
-            logging.info(f"Added {class_count} classes to dropdown")
+            # Notify listeners once for the reset selection
+            self.class_selector.currentIndexChanged.emit(0)
 
         except Exception as e:
             logging.error(f"Error in load_classes: {str(e)}")
 
+    def _get_attendance_records(self, class_id, date_str):
+        """Attendance records for a class and day, memoized until the next write"""
+        key = (class_id, date_str)
+        records = self._records_cache.get(key)
+        if records is None:
+            # A failed read raises and is never cached
+            records = self.db.get_attendance_records(class_id, date_str)
+            if len(self._records_cache) >= self.RECORDS_CACHE_SIZE:
+                # Evict the oldest read
+                del self._records_cache[next(iter(self._records_cache))]
+            self._records_cache[key] = records
+
+        # Copies, since the table model edits its records in place
+        return [dict(record) for record in records]
+
     def load_attendance_records(self):
         """Load attendance records for the selected class and date"""
         try:
             # Get selected class ID
             class_index = self.class_selector.currentIndex()
             if class_index <= 0:  # First item is placeholder
-                self.attendance_table.setRowCount(0)
+                self.attendance_model.set_records([])
                 self.status_label.setText("Please select a class")
                 return
 
@@ -229,103 +511,16 @@ class AttendanceTab(QWidget):
             date_str = self.date_selector.date().toString("yyyy-MM-dd")
 
             # Get attendance records
-            records = self.db.get_attendance_records(class_id, date_str)
+            records = self._get_attendance_records(class_id, date_str)
 
-            # Clear existing table
-            self.attendance_table.setRowCount(0)
+            # Swap the records into the model in one reset
+            self.attendance_model.set_records(records, date_str)
 
             # If no records, show message
             if not records:
                 self.status_label.setText(f"No attendance records for selected date")
                 return
 
-            # Temporarily disconnect the cellChanged signal to prevent
-            # triggering it during loading
-            try:
-                self.attendance_table.cellChanged.disconnect(
-                    self.on_attendance_cell_changed
-                )
-            except TypeError:
-                # Signal was not connected
-                pass
-
-            # Populate table
-            self.attendance_table.setRowCount(len(records))
-            for row, record in enumerate(records):
-                try:
-                    # Convert record to string format for display
-                    student_id_item = QTableWidgetItem(record.get("student_id", ""))
-                    # Store the attendance ID as hidden data for later use when
-                    # editing notes
-                    student_id_item.setData(
-                        Qt.ItemDataRole.UserRole, record.get("id", "")
-                    )
-                    self.attendance_table.setItem(row, 0, student_id_item)
-
-                    # Student name
-                    self.attendance_table.setItem(
-                        row, 1, QTableWidgetItem(record.get("name", ""))
-                    )
-
-                    # Format check-in time
-                    check_in_time = record.get("check_in_time", "")
-                    time_display = check_in_time
-                    if check_in_time and len(check_in_time) > 16:  # If full timestamp
-                        # Extract date and time for display
-                        date_part = check_in_time[:10]  # YYYY-MM-DD
-                        time_part = check_in_time[11:16]  # HH:MM
-                        if date_str == date_part:
-                            # If same day as selected, just show time
-                            time_display = time_part
-                        else:
-                            # If different day, show date and time
-                            time_display = f"{date_part} {time_part}"
-
-                    self.attendance_table.setItem(
-                        row, 2, QTableWidgetItem(time_display)
-                    )
-
-                    # Status with color coding
-                    status = record.get("status", "Unknown")
-                    status_item = QTableWidgetItem(status)
-                    if status == "Present":
-                        status_item.setBackground(QColor(200, 255, 200))  # Light green
-                    elif status == "Absent":
-                        status_item.setBackground(QColor(255, 200, 200))  # Light red
-                    elif status == "Late":
-                        status_item.setBackground(QColor(255, 255, 200))  # Light yellow
-                    self.attendance_table.setItem(row, 3, status_item)
-
-                    # Location
-                    location = record.get("location", "")
-                    self.attendance_table.setItem(row, 4, QTableWidgetItem(location))
-
-                    # Notes - make editable
-                    notes = record.get("notes", "")
-                    notes_item = QTableWidgetItem(notes)
-                    self.attendance_table.setItem(row, 5, notes_item)
-
-                except Exception as row_error:
-                    logging.error(f"Error processing attendance row {row}: {row_error}")
-                    continue
-
-            # Reconnect the cellChanged signal
-            try:
-                self.attendance_table.cellChanged.connect(
-                    self.on_attendance_cell_changed
-                )
-            except TypeError:
-                # Signal was already connected
-                pass
-
-            # Resize columns to content
-            self.attendance_table.resizeColumnsToContents()
-
-            # Make sure Notes column is wide enough
-            notes_column_width = self.attendance_table.columnWidth(5)
-            if notes_column_width < 200:
-                self.attendance_table.setColumnWidth(5, 200)
-
             # Update status label
             self.status_label.setText(f"Showing {len(records)} attendance records")
 
@@ -337,15 +532,6 @@ class AttendanceTab(QWidget):
             else:
                 logging.error("status_label not found in AttendanceTab")
 
-            # Make sure signal gets reconnected even after error
-            try:
-                self.attendance_table.cellChanged.connect(
-                    self.on_attendance_cell_changed
-                )
-            except TypeError:
-                # Signal was already connected
-                pass
-
     def perform_face_check_in(self):
         """Perform continuous face recognition-based check-in"""
         try:
@@ -370,9 +556,9 @@ class AttendanceTab(QWidget):
                 return
 
             # Initialize camera
-            import cv2
-
             self.cap = cv2.VideoCapture(0)
+            # Keep only the latest frame so detection never runs on stale input
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
 
             if not self.cap.isOpened():
                 QMessageBox.critical(
@@ -382,6 +568,12 @@ class AttendanceTab(QWidget):
                 )
                 return
 
+            # Load the face detector on first camera start
+            if self.face_cascade is None:
+                self.face_cascade = cv2.CascadeClassifier(
+                    cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+                )
+
             # Update button text to "Stop Camera"
             self.face_check_in_btn.setText("Stop Camera")
             self.face_check_in_btn.setStyleSheet(
@@ -394,25 +586,46 @@ class AttendanceTab(QWidget):
             self.camera_frame.setAlignment(Qt.AlignmentFlag.AlignCenter)
             self.camera_frame.setStyleSheet("border: 2px solid #ddd;")
 
-            # Add to layout above attendance table
-            camera_layout = QHBoxLayout()
-            camera_layout.addStretch()
-            camera_layout.addWidget(self.camera_frame)
-            camera_layout.addStretch()
-
-            # Insert camera layout at position 2 (after actions)
-            layout_count = self.layout().count()
-            for i in range(layout_count):
-                if (
-                    isinstance(self.layout().itemAt(i).layout(), QHBoxLayout)
-                    and self.layout().itemAt(i).layout().count() > 0
-                    and isinstance(
-                        self.layout().itemAt(i).layout().itemAt(0).widget(), QPushButton
-                    )
-                ):
-                    # Found buttons layout, insert camera after it
-                    self.layout().insertLayout(i + 1, camera_layout)
-                    break
+            # Add between the stretches of the preview row (after actions)
+            self.camera_layout.insertWidget(1, self.camera_frame)
+
+            # Load stored face encodings once for the whole session
+            unencoded = self._build_known_db()
+
+            # Seed today's check-ins once instead of querying per recognized face
+            today = datetime.now().strftime("%Y-%m-%d")
+            self._checked_in_today = {
+                record["student_id"]
+                for record in self.db.get_attendance_records(class_id, today)
+            }
+
+            # Start the background worker that does detection and matching
+            self._camera_class_id = class_id
+            self._worker_busy = False
+            self._overlays = []
+            self._prev_gray = None
+            self._motion = 0.0
+            self._idle_samples = 0
+            self._unresolved_faces = False
+            self._face_thread = QThread(self)
+            self._face_worker = FaceWorker(
+                self.face_cascade,
+                self._match_face,
+                self._add_known_faces,
+                self.DETECTION_SCALE,
+            )
+            self._face_worker.moveToThread(self._face_thread)
+            self.work_requested.connect(self._face_worker.process)
+            self.encode_requested.connect(self._face_worker.encode_faces)
+            self._face_worker.matched.connect(self.on_faces_matched)
+            self._face_worker.encoded.connect(self.on_faces_encoded)
+            self._face_thread.finished.connect(self._face_worker.deleteLater)
+            self._face_thread.start()
+
+            # Faces registered without a stored encoding are encoded on the
+            # worker before its first frame, keeping the camera start instant
+            if unencoded:
+                self.encode_requested.emit(unencoded)
 
             # Set flag
             self.camera_running = True
@@ -443,254 +656,305 @@ class AttendanceTab(QWidget):
             if hasattr(self, "cap") and self.cap:
                 self.cap.release()
 
+            # Shut down the face worker thread
+            if self._face_worker is not None:
+                self.work_requested.disconnect(self._face_worker.process)
+                self.encode_requested.disconnect(self._face_worker.encode_faces)
+                self._face_worker = None
+            if self._face_thread is not None:
+                self._face_thread.quit()
+                self._face_thread.wait()
+                self._face_thread = None
+            self._worker_busy = False
+            self._overlays = []
+
             # Remove camera frame from layout
             if hasattr(self, "camera_frame"):
                 self.camera_frame.setParent(None)
                 self.camera_frame.deleteLater()
 
+            # Forget the session's check-ins and preview buffers
+            self._checked_in_today = set()
+            self._rgb_buf = None
+            self._display_size = None
+
             # Reset flag
             self.camera_running = False
 
         except Exception as e:
             logging.error(f"Error stopping camera: {e}")
 
+    def _build_known_db(self):
+        """
+        Load stored face encodings and return the students still to encode.
+
+        A stored encoding is reused only while the student's face image is
+        the same file, unmodified, as the one it was computed from. Students
+        whose image has no such encoding (registered before encodings were
+        stored, or with a replaced image) are returned as (student_id, name,
+        face_image_path) for FaceWorker.encode_faces.
+        """
+        stored = {row["student_id"]: row for row in self.db.get_face_encodings()}
+
+        known_ids = []
+        known_names = []
+        encodings = []
+        unencoded = []
+        for student in self.db.get_students():
+            student_id = student.get("student_id")
+            face_path = student.get("face_image_path")
+            if not face_path or not os.path.exists(face_path):
+                continue
+            name = f"{student.get('first_name', '')} {student.get('last_name', '')}"
+
+            row = stored.get(student_id)
+            if (
+                row is None
+                or row["face_image_path"] != face_path
+                or row["face_image_mtime"] != os.path.getmtime(face_path)
+            ):
+                unencoded.append((student_id, name, face_path))
+                continue
+
+            known_ids.append(student_id)
+            known_names.append(name)
+            encodings.append(np.frombuffer(row["encoding"], dtype=np.float32))
+
+        self._set_known_faces(known_ids, known_names, encodings)
+        logging.info(
+            f"Loaded {len(known_ids)} known face encodings, "
+            f"{len(unencoded)} left to encode"
+        )
+        return unencoded
+
+    def _add_known_faces(self, ids, names, encodings):
+        """Append newly encoded faces; called on the FaceWorker thread"""
+        self._set_known_faces(
+            self.known_ids + ids,
+            self.known_names + names,
+            list(self.known_matrix) + encodings,
+        )
+
+    def _set_known_faces(self, known_ids, known_names, encodings):
+        """Build the matching structures from per-student float32 encodings"""
+        self.known_ids = known_ids
+        self.known_names = known_names
+        self.known_matrix = (
+            np.vstack(encodings)
+            if encodings
+            else np.empty((0, 128), dtype=np.float32)
+        )
+
+        # int8 copy of the matrix for the distance kernel; one global scale
+        # keeps the L2 ordering intact and distances are rescaled on the way out
+        max_abs = float(np.max(np.abs(self.known_matrix))) if encodings else 0.0
+        self._q_scale = 127.0 / max_abs if max_abs > 0 else 1.0
+        self.known_q = np.round(self.known_matrix * self._q_scale).astype(np.int8)
+        self._known_q_sq = np.einsum(
+            "ij,ij->i", self.known_q, self.known_q, dtype=np.int32
+        )
+
+        # Exact L2 index searched in a single C++ call when FAISS is installed
+        self._faiss_index = None
+        if faiss is not None and encodings:
+            self._faiss_index = faiss.IndexFlatL2(self.known_matrix.shape[1])
+            self._faiss_index.add(np.ascontiguousarray(self.known_matrix))
+
+    def on_faces_encoded(self, stored):
+        """Persist encodings computed by the worker (UI thread)"""
+        for student_id, encoding, face_path, face_mtime in stored:
+            self.db.save_face_encoding(student_id, encoding, face_path, face_mtime)
+        logging.info(f"Encoded and stored {len(stored)} face images")
+
+    def _match_face(self, face_encoding):
+        """Return (student_id, name, confidence) of the closest known face"""
+        if len(self.known_ids) == 0:
+            return None, "", 0
+
+        if self._faiss_index is not None:
+            probe = np.asarray(face_encoding, dtype=np.float32)[np.newaxis, :]
+            squared, indices = self._faiss_index.search(probe, 1)
+            best_index = int(indices[0][0])
+            return (
+                self.known_ids[best_index],
+                self.known_names[best_index],
+                1 - float(np.sqrt(squared[0][0])),
+            )
+
+        # Quantize the probe with the same scale as the known matrix
+        probe_q = np.clip(
+            np.round(np.asarray(face_encoding) * self._q_scale), -127, 127
+        ).astype(np.int8)
+
+        # ||a - b||^2 = |a|^2 + |b|^2 - 2 a.b, accumulated in int32
+        dots = np.einsum("ij,j->i", self.known_q, probe_q, dtype=np.int32)
+        probe_sq = int(np.dot(probe_q.astype(np.int32), probe_q.astype(np.int32)))
+        squared = self._known_q_sq + probe_sq - 2 * dots
+
+        # Distance to every known face, back in encoding units (lower is better)
+        distances = np.sqrt(np.maximum(squared, 0)) / self._q_scale
+        best_index = int(np.argmin(distances))
+
+        return (
+            self.known_ids[best_index],
+            self.known_names[best_index],
+            1 - float(distances[best_index]),
+        )
+
+    def display_camera_frame(self, frame):
+        """Show a BGR frame in the camera label using a reused RGB buffer"""
+        height, width = frame.shape[:2]
+
+        # (Re)allocate the conversion buffer only when the frame size changes
+        if self._rgb_buf is None or self._rgb_buf.shape != frame.shape:
+            self._rgb_buf = np.empty((height, width, 3), dtype=np.uint8)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
+
+        # Non-owning view over self._rgb_buf; fromImage() copies before reuse
+        q_img = QImage(
+            self._rgb_buf.data, width, height, 3 * width, QImage.Format.Format_RGB888
+        )
+
+        if self._display_size is None:
+            self._display_size = self.camera_frame.size()
+
+        self.camera_frame.setPixmap(
+            QPixmap.fromImage(q_img).scaled(
+                self._display_size, Qt.AspectRatioMode.KeepAspectRatio
+            )
+        )
+
     def process_camera_frame(self, class_id, class_name):
-        """Process a camera frame for face recognition"""
+        """Show the next camera frame and hand every 10th one to the worker"""
         try:
             # Read frame
             ret, frame = self.cap.read()
             if not ret:
                 return
 
-            # Convert frame to QImage for display
-            height, width, channel = frame.shape
-            bytes_per_line = 3 * width
-            from PyQt6.QtGui import QImage, QPixmap
-
-            q_img = QImage(
-                frame.data, width, height, bytes_per_line, QImage.Format.Format_RGB888
-            ).rgbSwapped()
-
-            # Display in label
-            self.camera_frame.setPixmap(
-                QPixmap.fromImage(q_img).scaled(
-                    self.camera_frame.width(),
-                    self.camera_frame.height(),
-                    Qt.AspectRatioMode.KeepAspectRatio,
-                )
-            )
+            # Measure motion on every frame, before the overlays are drawn
+            self._update_motion(frame)
 
             # Only process for face recognition every 1 second (10 frames at
-            # 100ms)
+            # 100ms), and drop the frame if the worker is still busy
             if not hasattr(self, "frame_counter"):
                 self.frame_counter = 0
 
             self.frame_counter += 1
-            if self.frame_counter < 10:
-                return
+            if self.frame_counter >= 10 and not self._worker_busy:
+                self.frame_counter = 0
+                self._idle_samples += 1
 
-            self.frame_counter = 0
+                # Re-check a still scene now and then while a face is unresolved
+                retry = (
+                    self._unresolved_faces
+                    and self._idle_samples >= self.FORCE_DETECT_EVERY
+                )
+                if self._motion >= self.MOTION_THRESHOLD or retry:
+                    self._motion = 0.0
+                    self._idle_samples = 0
+                    self._worker_busy = True
+                    self.work_requested.emit(frame.copy())
+
+            # Draw the latest recognition results over the live feed
+            for (top, right, bottom, left), label in self._overlays:
+                cv2.rectangle(frame, (left, top), (right, bottom), (0, 255, 0), 2)
+                cv2.putText(
+                    frame,
+                    label,
+                    (left, top - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX,
+                    0.5,
+                    (0, 255, 0),
+                    2,
+                )
 
-            # Process frame for face recognition
-            import face_recognition
-            import sqlite3
-            import os
+            # Display in label
+            self.display_camera_frame(frame)
 
-            # Convert frame to RGB for face_recognition
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        except Exception as e:
+            logging.error(f"Error processing camera frame: {e}")
 
-            # Find faces
-            face_locations = face_recognition.face_locations(rgb_frame)
+    def _update_motion(self, frame):
+        """Keep the largest 80x60 pixel diff since the last detection"""
+        gray = cv2.cvtColor(cv2.resize(frame, (80, 60)), cv2.COLOR_BGR2GRAY)
+        previous = self._prev_gray
+        self._prev_gray = gray
+
+        if previous is None:
+            # Nothing to compare with yet; let the first sample through
+            self._motion = float("inf")
+        else:
+            self._motion = max(self._motion, cv2.absdiff(gray, previous).mean())
+
+    def on_faces_matched(self, results):
+        """Record attendance for faces matched by the worker (UI thread)"""
+        self._worker_busy = False
+        if not self.camera_running:
+            return
+
+        class_id = self._camera_class_id
+
+        # Unmatched or weak faces are detected again even if nobody moves
+        self._unresolved_faces = any(
+            not student_id or confidence <= self.MIN_CONFIDENCE
+            for student_id, _, confidence, _ in results
+        )
 
-            if not face_locations:
-                # No faces detected
-                return
+        try:
+            # Collect this frame's check-ins so they are written in one transaction
+            batch = []
+            checked_in_names = []
+            overlays = []
+            for student_id, name, confidence, bbox in results:
+                # Skip weak matches
+                if not student_id or confidence <= self.MIN_CONFIDENCE:
+                    continue
+
+                overlays.append((bbox, f"{name} ({student_id})"))
 
-            # Get face encodings
-            face_encodings = face_recognition.face_encodings(rgb_frame, face_locations)
+                # Students already marked present today are only highlighted
+                if student_id in self._checked_in_today:
+                    continue
 
-            if not face_encodings:
-                # No encodings possible
+                check_in_time = datetime.now()
+                status, is_late, late_minutes, pre_checkin_active = (
+                    self._compute_attendance(class_id, check_in_time)
+                )
+                notes = self._build_attendance_notes(
+                    is_late,
+                    late_minutes,
+                    pre_checkin_active,
+                    reason="Auto-detected late" if is_late else None,
+                    is_face_recognition=True,
+                    confidence=confidence,
+                )
+                batch.append(
+                    (
+                        class_id,
+                        student_id,
+                        status,
+                        check_in_time.strftime("%Y-%m-%d %H:%M:%S"),
+                        notes,
+                    )
+                )
+                checked_in_names.append(f"{name} ({status})")
+
+            self._overlays = overlays
+
+            if not batch:
                 return
 
-            # Compare with known faces
-            student_id = None
-            confidence = 0
-            student_name = ""
-
-            # Get students with face images for comparison
-            students = self.db.get_students()
-
-            # Check all detected faces against database
-            for face_encoding in face_encodings:
-                # Reset for each face
-                best_match_id = None
-                best_match_name = ""
-                best_confidence = 0
-
-                # Check against all students
-                for student in students:
-                    # Extract face path safely
-                    face_path = None
-                    try:
-                        if isinstance(student, dict):
-                            face_path = student.get("face_image_path", "")
-                            student_id_val = student.get("student_id", "unknown")
-                        elif isinstance(student, sqlite3.Row):
-                            # Try column name first
-                            try:
-                                face_path = student["face_image_path"]
-                                student_id_val = student["student_id"]
-                            except (IndexError, KeyError):
-                                # Fallback to column index
-                                face_path = student[8] if len(student) > 8 else None
-                                student_id_val = (
-                                    student[0] if len(student) > 0 else "unknown"
-                                )
-                        else:
-                            # Try tuple access
-                            face_path = student[8] if len(student) > 8 else None
-                            student_id_val = (
-                                student[0] if len(student) > 0 else "unknown"
-                            )
-
-                        if not face_path or not os.path.exists(face_path):
-                            continue
-
-                        # Check if we already processed this face image
-                        if not hasattr(self, "face_encodings_cache"):
-                            self.face_encodings_cache = {}
-
-                        if face_path in self.face_encodings_cache:
-                            known_encoding = self.face_encodings_cache[face_path]
-                        else:
-                            # Load and cache encoding
-                            known_image = face_recognition.load_image_file(face_path)
-                            known_faces = face_recognition.face_encodings(known_image)
-
-                            if not known_faces:
-                                continue
-
-                            known_encoding = known_faces[0]
-                            self.face_encodings_cache[face_path] = known_encoding
-
-                        # Compare faces
-                        matches = face_recognition.compare_faces(
-                            [known_encoding], face_encoding, tolerance=0.6
-                        )
-
-                        if matches and matches[0]:
-                            # Calculate face distance (lower is better)
-                            face_distance = face_recognition.face_distance(
-                                [known_encoding], face_encoding
-                            )[0]
-                            current_confidence = 1 - face_distance
-
-                            # If better match than previous, update
-                            if current_confidence > best_confidence:
-                                best_confidence = current_confidence
-
-                                # Get student details safely
-                                if isinstance(student, dict):
-                                    best_match_id = student.get("student_id", "")
-                                    best_match_name = f"{student.get('first_name', '')} {student.get('last_name', '')}"
-                                elif isinstance(student, sqlite3.Row):
-                                    try:
-                                        best_match_id = student["student_id"]
-                                        best_match_name = f"{student['first_name']} {student['last_name']}"
-                                    except (IndexError, KeyError):
-                                        best_match_id = student[0]
-                                        best_match_name = f"{student[1] if len(student) > 1 else ''} {student[2] if len(student) > 2 else ''}"
-                                else:
-                                    best_match_id = student[0]
-                                    best_match_name = f"{student[1] if len(student) > 1 else ''} {student[2] if len(student) > 2 else ''}"
-
-                    except Exception as face_error:
-                        logging.error(f"Error processing face comparison: {face_error}")
-                        continue
-
-                # If we found a good match for this face, mark attendance
-                if best_match_id and best_confidence > 0.6:  # 0.6 confidence threshold
-                    # Check if this student was already marked present today
-                    already_present = False
-
-                    try:
-                        from datetime import datetime
-
-                        today = datetime.now().strftime("%Y-%m-%d")
-
-                        # Get today's attendance records for this class
-                        attendance_records = self.db.get_attendance_records(
-                            class_id, today
-                        )
-
-                        # Check if student is already present
-                        for record in attendance_records:
-                            if (
-                                isinstance(record, dict)
-                                and record.get("student_id") == best_match_id
-                            ):
-                                already_present = True
-                                break
-                            elif (
-                                hasattr(record, "__getitem__")
-                                and record[1] == best_match_id
-                            ):  # Assuming student_id is second column
-                                already_present = True
-                                break
-
-                        # If not already marked present, mark attendance
-                        if not already_present:
-                            # Get current time for check-in
-                            check_in_time = datetime.now()
-
-                            # Process attendance
-                            self.process_attendance_check_in(
-                                student_id=best_match_id,
-                                class_id=class_id,
-                                check_in_time=check_in_time,
-                                is_face_recognition=True,
-                                confidence=best_confidence,
-                            )
-
-                            # Draw green rectangle around recognized face
-                            top, right, bottom, left = face_locations[0]
-                            cv2.rectangle(
-                                frame, (left, top), (right, bottom), (0, 255, 0), 2
-                            )
-
-                            # Display recognized student name
-                            cv2.putText(
-                                frame,
-                                f"{best_match_name} ({best_match_id})",
-                                (left, top - 10),
-                                cv2.FONT_HERSHEY_SIMPLEX,
-                                0.5,
-                                (0, 255, 0),
-                                2,
-                            )
-
-                            # Update frame display
-                            q_img = QImage(
-                                frame.data,
-                                width,
-                                height,
-                                bytes_per_line,
-                                QImage.Format.Format_RGB888,
-                            ).rgbSwapped()
-                            self.camera_frame.setPixmap(
-                                QPixmap.fromImage(q_img).scaled(
-                                    self.camera_frame.width(),
-                                    self.camera_frame.height(),
-                                    Qt.AspectRatioMode.KeepAspectRatio,
-                                )
-                            )
-
-                    except Exception as record_error:
-                        logging.error(f"Error recording attendance: {record_error}")
+            self.db.mark_attendance_many(batch)
+            self._checked_in_today.update(row[1] for row in batch)
+            self._records_cache.clear()
+
+            # Refresh records without a blocking dialog
+            self.load_attendance_records()
+            self.status_label.setText(f"Checked in: {', '.join(checked_in_names)}")
 
         except Exception as e:
-            logging.error(f"Error processing camera frame: {e}")
+            logging.error(f"Error recording attendance: {e}")
 
     def manual_check_in(self):
         """Open dialog for manual student check-in"""
@@ -747,6 +1011,96 @@ class AttendanceTab(QWidget):
                 self, "Error", f"Failed to open manual check-in: {str(e)}"
             )
 
+    def _schedule_start_times(self, class_id):
+        """Return {weekday: start time} for a class, parsed once and cached"""
+        if class_id not in self._schedule_cache:
+            start_times = {}
+            for schedule in self.db.get_class_schedules(class_id):
+                day = schedule.get("day_of_week")
+                start_time_str = schedule.get("start_time")
+                if not day or not start_time_str or day in start_times:
+                    continue
+                try:
+                    start_times[day] = datetime.strptime(start_time_str, "%H:%M").time()
+                except ValueError as time_error:
+                    logging.error(f"Error parsing time: {time_error}")
+            self._schedule_cache[class_id] = start_times
+
+        return self._schedule_cache[class_id]
+
+    def _compute_attendance(self, class_id, check_in_time):
+        """
+        Work out the attendance status for a check-in without any UI prompts.
+
+        :return: Tuple of (status, is_late, late_minutes, pre_checkin_active)
+        """
+        is_late = False
+        late_minutes = 0
+        pre_checkin_active = False
+
+        # Check if we're in pre-check-in mode for this class
+        if (
+            hasattr(self, "pre_checkin_config")
+            and self.pre_checkin_config.get("class_id") == class_id
+        ):
+            pre_checkin_active = True
+            config = self.pre_checkin_config
+
+            # If check-in time is after the late threshold, mark as late
+            if check_in_time > config["late_time"]:
+                is_late = True
+                late_minutes = int(
+                    (check_in_time - config["class_start"]).total_seconds() // 60
+                )
+        else:
+            # Fall back to regular schedule check
+            schedule_time = self._schedule_start_times(class_id).get(
+                check_in_time.strftime("%A")  # Monday, Tuesday, etc.
+            )
+
+            if schedule_time is not None:
+                class_start = datetime.combine(check_in_time.date(), schedule_time)
+
+                # Calculate minutes late
+                if check_in_time > class_start:
+                    time_diff = check_in_time - class_start
+                    late_minutes = time_diff.seconds // 60
+                    if late_minutes > 5:  # More than 5 minutes late is considered "Late"
+                        is_late = True
+
+        status = "Late" if is_late else "Present"
+        return status, is_late, late_minutes, pre_checkin_active
+
+    def _build_attendance_notes(
+        self,
+        is_late,
+        late_minutes,
+        pre_checkin_active,
+        reason=None,
+        is_face_recognition=False,
+        confidence=None,
+    ):
+        """Compose the notes stored with an attendance record"""
+        notes = ""
+        if is_face_recognition and confidence:
+            notes = f"Face recognition (confidence: {confidence:.1%})"
+
+        if is_late:
+            if reason:
+                notes = f"Late by {late_minutes} minutes. Reason: {reason}" + (
+                    f" {notes}" if notes else ""
+                )
+            else:
+                notes = f"Late by {late_minutes} minutes." + (
+                    f" {notes}" if notes else ""
+                )
+
+        # Add pre-check-in information to notes if active
+        if pre_checkin_active:
+            notes = "Pre-check-in mode active. " + notes
+
+        return notes
+
     def process_attendance_check_in(
         self,
         student_id,
@@ -764,131 +1118,102 @@ class AttendanceTab(QWidget):
                 return
 
             # Get current date and time if not provided
-            from datetime import datetime
-
             if not check_in_time:
                 check_in_time = datetime.now()
 
             check_in_time_str = check_in_time.strftime("%Y-%m-%d %H:%M:%S")
 
-            # Check if we're in pre-check-in mode for this class
-            is_late = False
-            late_minutes = 0
-            pre_checkin_active = False
+            status, is_late, late_minutes, pre_checkin_active = (
+                self._compute_attendance(class_id, check_in_time)
+            )
 
-            if (
-                hasattr(self, "pre_checkin_config")
-                and self.pre_checkin_config.get("class_id") == class_id
-            ):
-                pre_checkin_active = True
-                config = self.pre_checkin_config
-
-                # If check-in time is after the late threshold, mark as late
-                if check_in_time > config["late_time"]:
-                    is_late = True
-                    late_minutes = int(
-                        (check_in_time - config["class_start"]).total_seconds() // 60
-                    )
-            else:
-                # Fall back to regular schedule check
-                class_schedules = self.db.get_class_schedules(class_id)
-
-                if class_schedules:
-                    # Find today's schedule
-                    today_weekday = check_in_time.strftime(
-                        "%A"
-                    )  # Monday, Tuesday, etc.
-                    today_schedule = None
-
-                    for schedule in class_schedules:
-                        if schedule.get("day_of_week") == today_weekday:
-                            today_schedule = schedule
-                            break
-
-                    if today_schedule:
-                        # Check if student is late
-                        start_time_str = today_schedule.get("start_time")
-                        if start_time_str:
-                            # Parse schedule start time
-                            try:
-                                schedule_time = datetime.strptime(
-                                    start_time_str, "%H:%M"
-                                ).time()
-                                class_start = datetime.combine(
-                                    check_in_time.date(), schedule_time
-                                )
-
-                                # Calculate minutes late
-                                if check_in_time > class_start:
-                                    time_diff = check_in_time - class_start
-                                    late_minutes = time_diff.seconds // 60
-                                    if (
-                                        late_minutes > 5
-                                    ):  # More than 5 minutes late is considered "Late"
-                                        is_late = True
-                            except Exception as time_error:
-                                logging.error(f"Error parsing time: {time_error}")
-
-            # Determine attendance status
-            status = "Late" if is_late else "Present"
-
-            # Prepare notes
-            notes = ""
-            if is_face_recognition and confidence:
-                notes = f"Face recognition (confidence: {confidence:.1%})"
-
-            # For late students, prompt for a reason
-            if is_late:
-                from PyQt6.QtWidgets import QInputDialog
-
-                reason, ok = QInputDialog.getText(
-                    self,
-                    "Late Arrival",
-                    f"Student is {late_minutes} minutes late. Please enter a reason:",
-                    QLineEdit.EchoMode.Normal,
+            # Late manual check-ins ask for a reason; queue the prompt so the
+            # calling handler (and the camera timer) return immediately
+            if is_late and not is_face_recognition:
+                QTimer.singleShot(
+                    0,
+                    lambda: self._prompt_late_reason(
+                        student_id,
+                        class_id,
+                        check_in_time_str,
+                        status,
+                        late_minutes,
+                        pre_checkin_active,
+                    ),
                 )
-
-                if ok and reason:
-                    notes = f"Late by {late_minutes} minutes. Reason: {reason}" + (
-                        f" {notes}" if notes else ""
-                    )
-                else:
-                    notes = f"Late by {late_minutes} minutes." + (
-                        f" {notes}" if notes else ""
-                    )
-
-            # Add pre-check-in information to notes if active
-            if pre_checkin_active:
-                pre_checkin_note = "Pre-check-in mode active. "
-                if notes:
-                    notes = pre_checkin_note + notes
-                else:
-                    notes = pre_checkin_note
-
-            # Mark attendance in database
-            self.db.mark_attendance(
-                class_id=class_id,
-                student_id=student_id,
-                status=status,
-                check_in_time=check_in_time_str,
-                notes=notes,
+                return True
+
+            notes = self._build_attendance_notes(
+                is_late,
+                late_minutes,
+                pre_checkin_active,
+                reason="Auto-detected late" if is_late else None,
+                is_face_recognition=is_face_recognition,
+                confidence=confidence,
+            )
+            return self._record_check_in(
+                student_id, class_id, check_in_time_str, status, notes, late_minutes
             )
 
-            # Show success message
-            QMessageBox.information(
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to process check-in: {str(e)}")
+            logging.error(f"Attendance check-in error: {e}")
+
+    def _prompt_late_reason(
+        self,
+        student_id,
+        class_id,
+        check_in_time_str,
+        status,
+        late_minutes,
+        pre_checkin_active,
+    ):
+        """Ask for a late-arrival reason, then record the check-in"""
+        try:
+            reason, ok = QInputDialog.getText(
                 self,
-                "Success",
-                f"Attendance for student {student_id} marked as {status}"
-                + (f" ({late_minutes} minutes late)" if is_late else ""),
+                "Late Arrival",
+                f"Student is {late_minutes} minutes late. Please enter a reason:",
+                QLineEdit.EchoMode.Normal,
             )
 
-            # Refresh attendance records
-            self.load_attendance_records()
+            notes = self._build_attendance_notes(
+                True, late_minutes, pre_checkin_active, reason=reason if ok else None
+            )
+            self._record_check_in(
+                student_id, class_id, check_in_time_str, status, notes, late_minutes
+            )
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to process check-in: {str(e)}")
             logging.error(f"Attendance check-in error: {e}")
 
+    def _record_check_in(
+        self, student_id, class_id, check_in_time_str, status, notes, late_minutes
+    ):
+        """Mark attendance in the database and refresh the table"""
+        self.db.mark_attendance(
+            class_id=class_id,
+            student_id=student_id,
+            status=status,
+            check_in_time=check_in_time_str,
+            notes=notes,
+        )
+        self._records_cache.clear()
+
+        # Show success message
+        QMessageBox.information(
+            self,
+            "Success",
+            f"Attendance for student {student_id} marked as {status}"
+            + (f" ({late_minutes} minutes late)" if status == "Late" else ""),
+        )
+
+        # Refresh attendance records
+        self.load_attendance_records()
+
+        return True
+
     def setup_pre_checkin(self):
         """Set up pre-check-in time window for the selected class"""
         try:
@@ -919,16 +1244,8 @@ class AttendanceTab(QWidget):
             form_layout = QFormLayout()
 
             # Get today's class schedule if it exists
-            from datetime import datetime
-
             today_weekday = datetime.now().strftime("%A")
-            class_schedules = self.db.get_class_schedules(class_id)
-            today_schedule = None
-
-            for schedule in class_schedules:
-                if schedule.get("day_of_week") == today_weekday:
-                    today_schedule = schedule
-                    break
+            start_time = self._schedule_start_times(class_id).get(today_weekday)
 
             # Start time input
             time_layout = QHBoxLayout()
@@ -942,18 +1259,9 @@ class AttendanceTab(QWidget):
             self.minutes_input.setRange(0, 59)
             self.minutes_input.setValue(0)
 
-            if today_schedule and today_schedule.get("start_time"):
-                try:
-                    # Parse start time from schedule
-                    start_time = datetime.strptime(
-                        today_schedule.get("start_time"), "%H:%M"
-                    ).time()
-                    self.hours_input.setValue(start_time.hour)
-                    self.minutes_input.setValue(start_time.minute)
-                except BaseException:
-                    logging.warning(
-                        f"Could not parse start time: {today_schedule.get('start_time')}"
-                    )
+            if start_time is not None:
+                self.hours_input.setValue(start_time.hour)
+                self.minutes_input.setValue(start_time.minute)
 
             time_layout.addWidget(hours_label)
             time_layout.addWidget(self.hours_input)
@@ -1032,8 +1340,6 @@ class AttendanceTab(QWidget):
     ):
         """Start pre-check-in mode with specified parameters"""
         try:
-            from datetime import datetime, timedelta
-
             # Calculate relevant times
             now = datetime.now()
             class_start_time = datetime(
@@ -1107,8 +1413,6 @@ class AttendanceTab(QWidget):
             if not hasattr(self, "pre_checkin_config"):
                 return
 
-            from datetime import datetime
-
             now = datetime.now()
             config = self.pre_checkin_config
 
@@ -1161,29 +1465,23 @@ class AttendanceTab(QWidget):
         except Exception as e:
             logging.error(f"Error updating pre-check-in status: {e}")
 
-    def on_attendance_cell_changed(self, row, column):
-        """Handle edits to attendance table cells"""
+    def on_attendance_notes_edited(self, attendance_id, new_notes):
+        """Persist edits made to the Notes column"""
         try:
-            # Only process changes to the Notes column (index 5)
-            if column != 5:
-                return
-
-            # Get the attendance record ID from the hidden data
-            attendance_id = self.attendance_table.item(row, 0).data(
-                Qt.ItemDataRole.UserRole
-            )
             if not attendance_id:
                 return
 
-            # Get the new note text
-            notes_item = self.attendance_table.item(row, column)
-            if not notes_item:
-                return
-
-            new_notes = notes_item.text()
+            # Update the note in the database; cached reads hold the old note
+            saved = self.db.update_attendance_note(attendance_id, new_notes)
+            self._records_cache.clear()
 
-            # Update the note in the database
-            self.db.update_attendance_note(attendance_id, new_notes)
+            if not saved:
+                # Show the note that is actually stored again
+                self.load_attendance_records()
+                QMessageBox.warning(
+                    self, "Error", "Could not update note; the change was not saved"
+                )
+                return
 
             # Log the update
             logging.info(f"Updated notes for attendance record {attendance_id}")
@@ -1,8 +1,14 @@
+import importlib.util
 import sys
-import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 import cv2
 import numpy as np
 from PyQt6.QtWidgets import (
+    QApplication,
     QWidget,
     QVBoxLayout,
     QHBoxLayout,
@@ -12,37 +18,251 @@ from PyQt6.QtWidgets import (
     QComboBox,
     QMessageBox,
 )
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import Qt, QSize, QThread, QTimer, pyqtSignal
 from PyQt6.QtGui import QImage, QPixmap
 
-# Conditional import to handle moviepy and fer issues
-try:
-    from fer import FER
-except ImportError:
-    print("Warning: FER library import failed. Emotion detection will be disabled.")
-    FER = None
-
 from app.models.database import Database
 
+# fer (TensorFlow) and numba are slow to import; both are loaded on first use
+# in BehaviorTab.load_emotion_detector and get_aggregate_kernel
+
+_STYLE = """
+    QFrame {
+        background-color: white;
+        border-radius: 10px;
+        padding: 20px;
+    }
+    QPushButton {
+        background-color: #1a73e8;
+        color: white;
+        border: none;
+        border-radius: 4px;
+        padding: 10px 20px;
+        font-size: 14px;
+    }
+    QPushButton:hover {
+        background-color: #1557b0;
+    }
+"""
+
+# FER's probability keys, in the column order of the smoothing ring buffer
+EMOTION_LABELS = ("angry", "disgust", "fear", "happy", "sad", "surprise", "neutral")
+
+
+def aggregate_emotions(ring, count):
+    """Return (label index, mean probability) of the strongest emotion.
+
+    Only the first ``count`` rows of ``ring`` hold observations.
+    """
+    best_idx = 0
+    best_mean = -1.0
+    for j in range(ring.shape[1]):
+        total = 0.0
+        for i in range(count):
+            total += ring[i, j]
+        mean = total / count
+        if mean > best_mean:
+            best_idx = j
+            best_mean = mean
+    return best_idx, best_mean
+
+
+def opencl_enabled():
+    """Whether OpenCV will run UMat operations through OpenCL."""
+    try:
+        return cv2.ocl.haveOpenCL() and cv2.ocl.useOpenCL()
+    except cv2.error:
+        return False
+
+
+_aggregate_kernel = None
+
+
+def get_aggregate_kernel():
+    """Return aggregate_emotions, JIT-compiled with numba when available."""
+    global _aggregate_kernel
+    if _aggregate_kernel is None:
+        try:
+            from numba import njit
+
+            _aggregate_kernel = njit(cache=True)(aggregate_emotions)
+        except ImportError:
+            _aggregate_kernel = aggregate_emotions
+    return _aggregate_kernel
+
+
+class FrameGrabber(QThread):
+    """Owns the camera read loop and hands out only the frames that are used.
+
+    Emitted frames are already converted to RGB and carry the
+    time.monotonic() stamp of their capture.
+    """
+
+    frameReady = pyqtSignal(object, float)
+    analysisFrameReady = pyqtSignal(object, float)
+
+    def __init__(self, camera, display_every=3, emotion_every=10, parent=None):
+        super().__init__(parent)
+        self.camera = camera
+        self.display_every = display_every
+        self.emotion_every = emotion_every
+        self._stop_event = threading.Event()
+        self._use_umat = opencl_enabled()
+
+    def run(self):
+        self._stop_event.clear()
+        tick = 0
+
+        while not self._stop_event.is_set():
+            # grab() only advances the stream; decoding is deferred to
+            # retrieve() and skipped on ticks nobody consumes
+            if not self.camera.grab():
+                self._stop_event.wait(0.01)
+                continue
+            stamp = time.monotonic()
+            tick += 1
+
+            needs_display = tick % self.display_every == 0
+            needs_emotion = tick % self.emotion_every == 0
+            if not (needs_display or needs_emotion):
+                continue
+
+            ret, frame = self.camera.retrieve()
+            if not ret:
+                continue
+
+            # Convert once for both the preview and FER
+            frame = self.convert_rgb(frame)
+
+            if needs_emotion:
+                self.analysisFrameReady.emit(frame, stamp)
+
+            if needs_display:
+                self.frameReady.emit(frame, stamp)
+
+    def convert_rgb(self, frame):
+        """Convert a BGR frame to RGB, on the GPU when OpenCL is available."""
+        if self._use_umat:
+            return cv2.cvtColor(cv2.UMat(frame), cv2.COLOR_BGR2RGB).get()
+
+        # In place: the retrieved frame is not used as BGR afterwards
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=frame)
+        return frame
+
+    def stop(self):
+        self._stop_event.set()
+        self.wait()
+
+
+class EmotionAnalyzer:
+    """Runs FER on camera frames; used from a single executor thread."""
+
+    INPUT_SIZE = (320, 240)
+    REDETECT_EVERY = 10
+    SMOOTHING_WINDOW = 8
+
+    def __init__(self, emotion_detector):
+        self.emotion_detector = emotion_detector
+        self._rgb_buf = None
+        self._use_umat = opencl_enabled()
+
+        # Last face box (in INPUT_SIZE coordinates) and its age in frames
+        self._face_boxes = None
+        self._frames_since_detect = 0
+
+        # Recent FER probabilities, averaged to steady the reported emotion
+        self._ring = np.zeros((self.SMOOTHING_WINDOW, len(EMOTION_LABELS)), np.float32)
+        self._head = 0
+        self._count = 0
+        self._aggregate = get_aggregate_kernel()
+
+    def analyze(self, frame):
+        """Return (dominant_emotion, score) for an RGB frame, or None."""
+        emotions = self.detect_emotions(self.downscale(frame))
+
+        if not emotions:
+            return None
+
+        # Get dominant emotion over the recent window
+        probabilities = emotions[0]["emotions"]
+        self._ring[self._head] = [
+            probabilities.get(label, 0.0) for label in EMOTION_LABELS
+        ]
+        self._head = (self._head + 1) % self.SMOOTHING_WINDOW
+        self._count = min(self._count + 1, self.SMOOTHING_WINDOW)
+
+        label_idx, emotion_score = self._aggregate(self._ring, self._count)
+        return EMOTION_LABELS[label_idx], float(emotion_score)
+
+    def downscale(self, frame):
+        """Resize a frame to INPUT_SIZE, on the GPU when OpenCL is available."""
+        if self._use_umat:
+            return cv2.resize(
+                cv2.UMat(frame), self.INPUT_SIZE, interpolation=cv2.INTER_AREA
+            ).get()
+
+        width, height = self.INPUT_SIZE
+        if self._rgb_buf is None:
+            self._rgb_buf = np.empty((height, width, 3), dtype=np.uint8)
+        cv2.resize(
+            frame,
+            self.INPUT_SIZE,
+            dst=self._rgb_buf,
+            interpolation=cv2.INTER_AREA,
+        )
+        return self._rgb_buf
+
+    def detect_emotions(self, rgb_frame):
+        """Run FER, reusing the last face box between full detections."""
+        if self._face_boxes and self._frames_since_detect < self.REDETECT_EVERY:
+            # Classifier-only pass: skip face detection on the cached box
+            self._frames_since_detect += 1
+            emotions = self.emotion_detector.detect_emotions(
+                rgb_frame, face_rectangles=self._face_boxes
+            )
+        else:
+            self._frames_since_detect = 0
+            emotions = self.emotion_detector.detect_emotions(rgb_frame)
+
+        # Refresh (or drop) the cached box from whatever was found
+        self._face_boxes = [tuple(emotions[0]["box"])] if emotions else None
+        return emotions
+
 
 class BehaviorTab(QWidget):
+    emotionDetected = pyqtSignal(str, float)
+
+    FLUSH_INTERVAL_MS = 5000
+    FLUSH_MAX_ROWS = 50
+
+    # Frames delivered later than this (GUI thread was busy) are skipped
+    MAX_FRAME_AGE = 0.2
+
+    # MJPEG camera -> decoder -> BGR appsink that keeps only the newest frame
+    GSTREAMER_PIPELINE = (
+        "v4l2src device=/dev/video{index} ! image/jpeg,width=640,height=480 ! "
+        "jpegdec ! videoconvert ! video/x-raw,format=BGR ! "
+        "appsink drop=1 max-buffers=1"
+    )
+
     def __init__(self):
         super().__init__()
         self.db = Database()
         self.face_encodings = None
         self.captured_image = None
         self.emotion_detector = None
-
-        # Try to initialize emotion detector
-        try:
-            if FER:
-                self.emotion_detector = FER(mtcnn=True)
-        except Exception as e:
-            print(f"Error initializing emotion detector: {e}")
+        self._emotion_detector_loaded = False
 
         self.init_ui()
+        self.emotionDetected.connect(self.on_emotion_detected)
         self.setup_camera()
 
+        # Tabs never receive closeEvent when the main window closes, so also
+        # release the camera and worker threads on application exit
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.shutdown)
+
     def init_ui(self):
         """Initialize the behavior monitoring UI."""
         layout = QVBoxLayout(self)
@@ -70,8 +290,9 @@ class BehaviorTab(QWidget):
             "Negative Behavior Tracking",
         ]
 
-        # Disable emotion detection if FER is not available
-        if not FER:
+        # Disable emotion detection if FER is not available (checked
+        # without importing it)
+        if importlib.util.find_spec("fer") is None:
             emotion_items[0] += " (Unavailable)"
 
         self.emotion_combo.addItems(emotion_items)
@@ -92,30 +313,24 @@ class BehaviorTab(QWidget):
         layout.addWidget(camera_frame)
 
         # Styling
-        self.setStyleSheet(
-            """
-            QFrame {
-                background-color: white;
-                border-radius: 10px;
-                padding: 20px;
-            }
-            QPushButton {
-                background-color: #1a73e8;
-                color: white;
-                border: none;
-                border-radius: 4px;
-                padding: 10px 20px;
-                font-size: 14px;
-            }
-            QPushButton:hover {
-                background-color: #1557b0;
-            }
-        """
-        )
+        self.setStyleSheet(_STYLE)
 
         # Camera and Monitoring Setup
         self.camera = None
         self.monitoring = False
+        self.grabber = None
+        self._display_size = QSize(640, 480)
+        self._qimg_backing = None
+
+        # Single FER worker; at most one inference in flight at a time
+        self._analyzer = None
+        self._exec = None
+        self._inflight = None
+
+        # Behavior rows waiting to be written in one transaction
+        self._behavior_buf = deque()
+        self._flush_timer = QTimer(self)
+        self._flush_timer.timeout.connect(self._flush_behavior)
 
     def setup_camera(self):
         """Initialize camera for monitoring."""
@@ -126,7 +341,7 @@ class BehaviorTab(QWidget):
 
             for index in camera_indices:
                 try:
-                    cap = cv2.VideoCapture(index, cv2.CAP_DSHOW)
+                    cap, configured = self.open_camera(index)
                     if not cap.isOpened():
                         cap.release()
                         continue
@@ -137,6 +352,8 @@ class BehaviorTab(QWidget):
                         cap.release()
                         continue
 
+                    if not configured:
+                        self.configure_camera(cap)
                     self.camera = cap
                     break
                 except Exception as inner_e:
@@ -150,10 +367,11 @@ class BehaviorTab(QWidget):
                 )
                 return False
 
-            # Start timer to update camera preview
-            self.camera_timer = QTimer(self)
-            self.camera_timer.timeout.connect(self.update_camera_preview)
-            self.camera_timer.start(30)  # Update every 30ms
+            # Read frames on a background thread; the UI only paints them
+            self.grabber = FrameGrabber(self.camera, parent=self)
+            self.grabber.frameReady.connect(self.display_frame)
+            if self.isVisible():
+                self.grabber.start()  # otherwise showEvent starts it
 
             return True
         except Exception as e:
@@ -162,33 +380,35 @@ class BehaviorTab(QWidget):
             )
             return False
 
-    def update_camera_preview(self):
-        """Update the camera preview."""
-        if not self.camera or not self.camera.isOpened():
-            return
+    def open_camera(self, index):
+        """Open a camera index, preferring a GStreamer pipeline on Linux.
 
-        ret, frame = self.camera.read()
-        if ret:
-            # Convert frame to RGB
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-            # Convert frame for display
-            h, w, ch = frame.shape
-            bytes_per_line = ch * w
-            qt_image = QImage(
-                frame.data, w, h, bytes_per_line, QImage.Format.Format_RGB888
-            )
-            pixmap = QPixmap.fromImage(qt_image)
-
-            # Scale pixmap to fit label
-            self.camera_label.setPixmap(
-                pixmap.scaled(
-                    640,
-                    480,
-                    Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation,
-                )
+        Returns (capture, configured), where configured means the pipeline
+        already fixes the size and buffering.
+        """
+        if sys.platform.startswith("linux"):
+            cap = cv2.VideoCapture(
+                self.GSTREAMER_PIPELINE.format(index=index), cv2.CAP_GSTREAMER
             )
+            if cap.isOpened():
+                return cap, True
+            cap.release()
+            return cv2.VideoCapture(index, cv2.CAP_V4L2), False
+
+        return cv2.VideoCapture(index, cv2.CAP_DSHOW), False
+
+    def configure_camera(self, cap):
+        """Keep the driver queue short and capture at the display size."""
+        properties = [
+            (cv2.CAP_PROP_BUFFERSIZE, 1, "CAP_PROP_BUFFERSIZE"),
+            (cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"), "CAP_PROP_FOURCC"),
+            (cv2.CAP_PROP_FRAME_WIDTH, 640, "CAP_PROP_FRAME_WIDTH"),
+            (cv2.CAP_PROP_FRAME_HEIGHT, 480, "CAP_PROP_FRAME_HEIGHT"),
+            (cv2.CAP_PROP_FPS, 30, "CAP_PROP_FPS"),
+        ]
+        for prop, value, name in properties:
+            if not cap.set(prop, value):
+                print(f"Camera does not support {name}={value}")
 
     def toggle_monitoring(self):
         """Toggle behavior monitoring on and off."""
@@ -200,7 +420,7 @@ class BehaviorTab(QWidget):
 
         if self.monitoring:
             # Check if emotion detection is available
-            if not self.emotion_detector:
+            if not self.load_emotion_detector():
                 QMessageBox.warning(
                     self, "Emotion Detection", "Emotion detection is not available."
                 )
@@ -211,89 +431,188 @@ class BehaviorTab(QWidget):
             self.start_btn.setText("Start Monitoring")
             self.stop_monitoring()
 
+    def load_emotion_detector(self):
+        """Import FER and build the detector on first use."""
+        if self._emotion_detector_loaded:
+            return self.emotion_detector
+        self._emotion_detector_loaded = True
+
+        # Conditional import to handle moviepy and fer issues
+        try:
+            from fer import FER
+        except ImportError:
+            print(
+                "Warning: FER library import failed. Emotion detection will be disabled."
+            )
+            return None
+
+        try:
+            self.emotion_detector = FER(mtcnn=True)
+        except Exception as e:
+            print(f"Error initializing emotion detector: {e}")
+
+        return self.emotion_detector
+
     def start_monitoring(self):
         """Start continuous behavior monitoring."""
-        self.monitoring_timer = QTimer(self)
-        self.monitoring_timer.timeout.connect(self.process_frame)
-        self.monitoring_timer.start(100)  # Process every 100ms
+        if not self.emotion_detector or not self.grabber:
+            return
+
+        self._analyzer = EmotionAnalyzer(self.emotion_detector)
+        self._exec = ThreadPoolExecutor(max_workers=1)
+        self.grabber.analysisFrameReady.connect(self.submit_emotion_frame)
+        self._flush_timer.start(self.FLUSH_INTERVAL_MS)
 
     def stop_monitoring(self):
         """Stop behavior monitoring."""
-        if hasattr(self, "monitoring_timer"):
-            self.monitoring_timer.stop()
+        if self._exec:
+            if self.grabber:
+                self.grabber.analysisFrameReady.disconnect(self.submit_emotion_frame)
+            self._exec.shutdown(wait=True, cancel_futures=True)
+            self._exec = None
+            self._inflight = None
+            self._analyzer = None
+
+        # Write out anything still buffered
+        self._flush_timer.stop()
+        self._flush_behavior()
+
+        # Stop the grabber before releasing the camera it reads from
+        if self.grabber:
+            self.grabber.stop()
+            self.grabber = None
 
         # Release camera
         if self.camera:
             self.camera.release()
+            self.camera = None
 
         # Clear display
         self.camera_label.clear()
         self.results_label.clear()
 
-    def process_frame(self):
-        """Capture and process camera frame for behavior detection."""
-        if not self.camera or not self.camera.isOpened():
+    def submit_emotion_frame(self, frame, stamp):
+        """Queue a frame for FER unless the previous one is still running."""
+        if self._exec is None or self._is_stale(stamp):
             return
 
-        ret, frame = self.camera.read()
-        if not ret:
+        # Drop rather than queue, so results never lag behind the camera
+        if self._inflight is not None and not self._inflight.done():
             return
 
-        # Convert frame to RGB for emotion detection
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        self._inflight = self._exec.submit(self._analyzer.analyze, frame)
+        self._inflight.add_done_callback(self._on_inference_done)
+
+    def _on_inference_done(self, future):
+        """Forward a finished inference to the GUI thread."""
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"Emotion detection error: {e}")
+            return
 
-        # Detect emotions if detector is available
-        if self.emotion_detector:
-            try:
-                emotions = self.emotion_detector.detect_emotions(rgb_frame)
+        if result:
+            # Queued across threads by Qt's automatic connection
+            self.emotionDetected.emit(*result)
 
-                if emotions:
-                    # Get dominant emotion
-                    dominant_emotion = max(
-                        emotions[0]["emotions"], key=emotions[0]["emotions"].get
-                    )
-                    emotion_score = emotions[0]["emotions"][dominant_emotion]
+    def on_emotion_detected(self, dominant_emotion, emotion_score):
+        """Show and record an emotion reported by the worker thread."""
+        # A result still queued when monitoring stopped arrives after the
+        # final flush; recording it would leave a row that is never written
+        if self._exec is None:
+            return
 
-                    # Update results label
-                    result_text = f"Dominant Emotion: {dominant_emotion} (Confidence: {emotion_score:.2f})"
-                    self.results_label.setText(result_text)
+        # Update results label
+        result_text = f"Dominant Emotion: {dominant_emotion} (Confidence: {emotion_score:.2f})"
+        self.results_label.setText(result_text)
 
-                    # Record behavior in database
-                    self.record_behavior(dominant_emotion, emotion_score)
-            except Exception as e:
-                print(f"Emotion detection error: {e}")
+        # Record behavior in database
+        self.record_behavior(dominant_emotion, emotion_score)
 
-        # Display frame
-        self.display_frame(frame)
+    def _is_stale(self, stamp):
+        """Whether a frame captured at ``stamp`` is too old to be worth using."""
+        return time.monotonic() - stamp > self.MAX_FRAME_AGE
+
+    def display_frame(self, rgb_frame, stamp):
+        """Display an RGB camera frame in the UI."""
+        # A backlog of queued frames would replay old video; skip to the newest
+        if self._is_stale(stamp):
+            return
+
+        # QImage wraps the array without copying, so it must be contiguous
+        # and stay referenced until Qt has converted it
+        if not rgb_frame.flags["C_CONTIGUOUS"]:
+            rgb_frame = np.ascontiguousarray(rgb_frame)
+        self._qimg_backing = rgb_frame
 
-    def display_frame(self, frame):
-        """Display camera frame in the UI."""
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         h, w, ch = rgb_frame.shape
         bytes_per_line = ch * w
         qt_image = QImage(
-            rgb_frame.data, w, h, bytes_per_line, QImage.Format.Format_RGB888
+            self._qimg_backing.data, w, h, bytes_per_line, QImage.Format.Format_RGB888
         )
         pixmap = QPixmap.fromImage(qt_image)
         self.camera_label.setPixmap(
-            pixmap.scaled(640, 480, Qt.AspectRatioMode.KeepAspectRatio)
+            pixmap.scaled(
+                self._display_size,
+                Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.FastTransformation,
+            )
         )
 
     def record_behavior(self, emotion, confidence):
         """Record student behavior in the database."""
-        try:
-            # In a real-world scenario, you'd associate this with a specific
-            # student and class
-            self.db.record_behavior(
-                class_id=None,  # Replace with actual class ID
-                student_id=None,  # Replace with actual student ID
-                behavior_type="emotion",
-                behavior_value=f"{emotion}:{confidence}",
+        # In a real-world scenario, you'd associate this with a specific
+        # student and class
+        self._behavior_buf.append(
+            (
+                None,  # Replace with actual class ID
+                None,  # Replace with actual student ID
+                "emotion",
+                f"{emotion}:{confidence}",
+                # Same UTC format as the column's CURRENT_TIMESTAMP default
+                datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
             )
+        )
+
+        if len(self._behavior_buf) >= self.FLUSH_MAX_ROWS:
+            self._flush_behavior()
+
+    def _flush_behavior(self):
+        """Write buffered behavior rows to the database in one transaction."""
+        if not self._behavior_buf:
+            return
+
+        rows = list(self._behavior_buf)
+        self._behavior_buf.clear()
+        try:
+            self.db.record_behaviors_many(rows)
         except Exception as e:
             print(f"Error recording behavior: {e}")
 
+    def showEvent(self, event):
+        """Resume capture when the tab becomes visible."""
+        super().showEvent(event)
+        if (
+            self.grabber
+            and not self.grabber.isRunning()
+            and self.camera
+            and self.camera.isOpened()
+        ):
+            self.grabber.start()
+
+    def hideEvent(self, event):
+        """Pause capture (and with it emotion analysis) while hidden."""
+        if self.grabber and self.grabber.isRunning():
+            self.grabber.stop()
+        super().hideEvent(event)
+
+    def shutdown(self):
+        """Stop all background work and release the camera."""
+        self.monitoring = False
+        self.start_btn.setText("Start Monitoring")
+        self.stop_monitoring()
+
     def closeEvent(self, event):
         """Handle tab closure, release camera resources."""
-        self.stop_monitoring()
+        self.shutdown()
         event.accept()
@@ -1,31 +1,80 @@
-import sys
-import os
-import json
-from datetime import datetime
-
 from PyQt6.QtWidgets import (
     QWidget,
     QVBoxLayout,
     QHBoxLayout,
-    QLabel,
     QLineEdit,
     QPushButton,
-    QDateEdit,
     QMessageBox,
     QFrame,
     QFormLayout,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
+    QHeaderView,
     QTabWidget,
-    QScrollArea,
-    QGridLayout,
     QComboBox,
 )
-from PyQt6.QtCore import Qt, QDate, QTimer
-from PyQt6.QtGui import QImage, QPixmap, QFont, QIcon
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt6.QtGui import QIcon
 
 from app.models.database import Database
-from app.utils.config import DATA_DIR, ICONS_DIR
+from app.utils.config import ICONS_DIR
+
+# Button icons, decoded once per process
+_ICONS = {}
+
+
+def _icon(name):
+    """Return the cached QIcon for an icon file in ICONS_DIR."""
+    icon = _ICONS.get(name)
+    if icon is None:
+        icon = _ICONS[name] = QIcon(str(ICONS_DIR / name))
+    return icon
+
+
+class ClassesModel(QAbstractTableModel):
+    """Read-only table model over the rows returned for the class list."""
+
+    HEADERS = ["Class ID", "Name", "Subject", "Teacher", "Actions"]
+    ACTIONS_TEXT = "View | Edit | Delete"
+
+    # Every cell is read-only; combined once instead of per flags() call
+    _FLAGS = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+
+    def set_rows(self, rows):
+        """Replace the model contents with a single reset"""
+        self.beginResetModel()
+        self._rows = list(rows)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if (
+            role == Qt.ItemDataRole.DisplayRole
+            and orientation == Qt.Orientation.Horizontal
+        ):
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+
+        column = index.column()
+        if column == len(self.HEADERS) - 1:
+            # Actions (placeholder for future functionality)
+            return self.ACTIONS_TEXT
+        return str(self._rows[index.row()][column])
+
+    def flags(self, index):
+        return self._FLAGS
 
 
 class ClassManagementTab(QWidget):
@@ -98,13 +147,13 @@ class ClassManagementTab(QWidget):
 
         # Save Button
         save_btn = QPushButton("Save Class")
-        save_btn.setIcon(QIcon(str(ICONS_DIR / "save.png")))
+        save_btn.setIcon(_icon("save.png"))
         save_btn.clicked.connect(self.save_class)
         button_layout.addWidget(save_btn)
 
         # Clear Button
         clear_btn = QPushButton("Clear")
-        clear_btn.setIcon(QIcon(str(ICONS_DIR / "clear.png")))
+        clear_btn.setIcon(_icon("clear.png"))
         clear_btn.clicked.connect(self.clear_form)
         button_layout.addWidget(clear_btn)
 
@@ -116,16 +165,19 @@ class ClassManagementTab(QWidget):
         list_layout = QVBoxLayout(class_list_tab)
 
         # Table for class list
-        self.class_table = QTableWidget()
-        self.class_table.setColumnCount(5)
-        self.class_table.setHorizontalHeaderLabels(
-            ["Class ID", "Name", "Subject", "Teacher", "Actions"]
-        )
-        self.class_table.horizontalHeader().setStretchLastSection(True)
+        self.class_model = ClassesModel(self)
+        self.class_table = QTableView()
+        self.class_table.setModel(self.class_model)
+
+        # Fixed starting widths; sizing to contents would scan every cell
+        header = self.class_table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        header.setDefaultSectionSize(150)
+        header.setStretchLastSection(True)
 
         # Refresh button for class list
         refresh_btn = QPushButton("Refresh Class List")
-        refresh_btn.setIcon(QIcon(str(ICONS_DIR / "refresh.png")))
+        refresh_btn.setIcon(_icon("refresh.png"))
         refresh_btn.clicked.connect(self.load_classes)
 
         list_layout.addWidget(refresh_btn)
@@ -188,54 +240,17 @@ class ClassManagementTab(QWidget):
     def load_classes(self):
         """Load classes from the database and populate the table."""
         try:
-            # Clear existing rows
-            self.class_table.setRowCount(0)
-
             # Execute query to get all classes
-            cursor = self.db.connection.cursor()
-            cursor.execute(
+            classes = self.db.connection.execute(
                 "SELECT class_id, name, subject, teacher FROM classes ORDER BY name"
-            )
-            classes = cursor.fetchall()
-
-            # Set row count
-            self.class_table.setRowCount(len(classes))
-
-            # Populate table
-            for row, class_data in enumerate(classes):
-                # Class ID
-                id_item = QTableWidgetItem(str(class_data[0]))
-                id_item.setFlags(id_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-                self.class_table.setItem(row, 0, id_item)
-
-                # Name
-                name_item = QTableWidgetItem(str(class_data[1]))
-                name_item.setFlags(name_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-                self.class_table.setItem(row, 1, name_item)
-
-                # Subject
-                subject_item = QTableWidgetItem(str(class_data[2]))
-                subject_item.setFlags(
-                    subject_item.flags() & ~Qt.ItemFlag.ItemIsEditable
-                )
-                self.class_table.setItem(row, 2, subject_item)
-
-                # Teacher
-                teacher_item = QTableWidgetItem(str(class_data[3]))
-                teacher_item.setFlags(
-                    teacher_item.flags() & ~Qt.ItemFlag.ItemIsEditable
-                )
-                self.class_table.setItem(row, 3, teacher_item)
-
-                # Actions (placeholder for future functionality)
-                actions_item = QTableWidgetItem("View | Edit | Delete")
-                actions_item.setFlags(
-                    actions_item.flags() & ~Qt.ItemFlag.ItemIsEditable
-                )
-                self.class_table.setItem(row, 4, actions_item)
-
-            # Resize columns to content
-            self.class_table.resizeColumnsToContents()
+            ).fetchall()
+
+            # Populate table without repainting until the reset is done
+            self.class_table.setUpdatesEnabled(False)
+            try:
+                self.class_model.set_rows(classes)
+            finally:
+                self.class_table.setUpdatesEnabled(True)
 
         except Exception as e:
             QMessageBox.critical(
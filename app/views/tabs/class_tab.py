@@ -5,35 +5,153 @@ from PyQt6.QtWidgets import (
     QLabel,
     QLineEdit,
     QPushButton,
-    QFrame,
     QFormLayout,
     QTableWidget,
     QTableWidgetItem,
+    QTableView,
     QTabWidget,
     QDialog,
-    QDialogButtonBox,
     QTextEdit,
     QComboBox,
     QHeaderView,
-    QGridLayout,
-    QGroupBox,
     QCheckBox,
     QTimeEdit,
     QSpinBox,
     QMessageBox,
     QSplitter,
     QAbstractItemView,
+    QApplication,
+    QStyle,
+    QStyledItemDelegate,
+    QStyleOptionButton,
+    QStyleOptionViewItem,
+    QButtonGroup,
+)
+from PyQt6.QtCore import (
+    Qt,
+    QTime,
+    QAbstractTableModel,
+    QModelIndex,
+    QEvent,
+    QSortFilterProxyModel,
+    pyqtSignal,
 )
-from PyQt6.QtCore import Qt, QDate, QTime, QDateTime
-from PyQt6.QtGui import QFont, QIcon
-
 from app.models.database import Database
-from app.utils.config import ICONS_DIR
-import json
-import uuid
-import pathlib
 import logging
+import re
 import sqlite3
+from collections import Counter
+
+# "HH:mm" for every minute of the day, indexed by minute-of-day
+_HHMM = tuple(f"{m // 60:02d}:{m % 60:02d}" for m in range(24 * 60))
+_HHMM_RE = re.compile(r"(\d{1,2}):(\d{2})")
+
+
+# Item flags for read-only table cells (Qt's defaults minus ItemIsEditable)
+_READONLY_FLAGS = Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEnabled
+
+# Day checkbox labels; bit i of a day mask is _DAY_NAMES[i]
+_DAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+
+def _days_text(mask):
+    """Format a 7-bit day mask as the "Mon, Wed" text stored for schedules."""
+    return ", ".join(_DAY_NAMES[i] for i in range(7) if mask & (1 << i))
+
+
+def _min_to_hhmm(minutes):
+    """Format a minute-of-day as HH:mm."""
+    return _HHMM[minutes]
+
+
+def _qtime_to_min(qtime):
+    """Minute-of-day of a QTime."""
+    return qtime.hour() * 60 + qtime.minute()
+
+
+# SQL used by the class tabs, kept as constants so sqlite3's statement
+# cache sees the same text on every call
+_SQL_LIST_CLASSES = """
+    SELECT class_id, name, subject, teacher, created_at
+    FROM classes
+    ORDER BY created_at DESC
+"""
+
+# Classes created since the newest listed one. created_at only has
+# one-second resolution, so rows from that same second come back too and
+# are skipped by class_id.
+_SQL_LIST_NEW_CLASSES = """
+    SELECT class_id, name, subject, teacher, created_at
+    FROM classes
+    WHERE created_at >= ?
+    ORDER BY created_at DESC
+"""
+
+_SQL_INSERT_CLASS = """
+    INSERT INTO classes (
+        class_id, name, subject, teacher,
+        room, class_type, description, max_capacity,
+        created_at, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+"""
+
+_SQL_INSERT_SCHEDULE = """
+    INSERT INTO class_schedules (class_id, days, start_time, end_time)
+    VALUES (?, ?, ?, ?)
+"""
+
+# Class fields plus one row per schedule (NULL schedule columns if none)
+_SQL_CLASS_DETAIL = """
+    SELECT
+        c.class_id, c.name, c.subject, c.teacher,
+        c.room, c.class_type, c.description, c.max_capacity,
+        s.days, s.start_time, s.end_time
+    FROM classes c
+    LEFT JOIN class_schedules s ON s.class_id = c.class_id
+    WHERE c.class_id = ?
+"""
+
+_SQL_UPDATE_CLASS = """
+    UPDATE classes
+    SET
+        name = ?,
+        subject = ?,
+        teacher = ?,
+        room = ?,
+        class_type = ?,
+        description = ?,
+        max_capacity = ?,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE class_id = ?
+"""
+
+_SQL_SELECT_SCHEDULES = """
+    SELECT id, class_id, days, start_time, end_time
+    FROM class_schedules
+    WHERE class_id = ?
+"""
+
+_SQL_DELETE_SCHEDULE = """
+    DELETE FROM class_schedules
+    WHERE id = ?
+"""
+
+_SQL_SELECT_ENROLLED = """
+    SELECT s.student_id, s.first_name || ' ' || s.last_name AS full_name
+    FROM students s
+    JOIN class_enrollments ce ON s.student_id = ce.student_id
+    WHERE ce.class_id = ?
+"""
+
+_SQL_INSERT_ENROLLMENT = """
+    INSERT OR IGNORE INTO class_enrollments (student_id, class_id)
+    VALUES (?, ?)
+"""
+
+_SQL_DELETE_ENROLLMENT = """
+    DELETE FROM class_enrollments
+    WHERE student_id = ? AND class_id = ?
+"""
 
 
 class TimePickerWidget(QWidget):
@@ -89,7 +207,7 @@ class TimePickerWidget(QWidget):
         elif ampm == "AM" and hour == 12:
             hour = 0
 
-        return f"{hour:02d}:{minute:02d}"
+        return _min_to_hhmm(hour * 60 + minute)
 
     def setTime(self, time_str):
         """
@@ -97,9 +215,10 @@ class TimePickerWidget(QWidget):
 
         :param time_str: Time in HH:mm format
         """
-        try:
-            hour, minute = map(int, time_str.split(":"))
+        match = _HHMM_RE.fullmatch(time_str or "")
+        hour, minute = (int(match[1]), int(match[2])) if match else (-1, -1)
 
+        if 0 <= hour < 24 and 0 <= minute < 60:
             # Convert to 12-hour format
             if hour == 0:
                 display_hour = 12
@@ -117,14 +236,68 @@ class TimePickerWidget(QWidget):
             self.hour_spinbox.setValue(display_hour)
             self.minute_spinbox.setValue(minute)
             self.ampm_combo.setCurrentText(ampm)
-
-        except (ValueError, IndexError):
+        else:
             # Default to 8:00 AM if parsing fails
             self.hour_spinbox.setValue(8)
             self.minute_spinbox.setValue(0)
             self.ampm_combo.setCurrentText("AM")
 
 
+class ButtonDelegate(QStyledItemDelegate):
+    """
+    Paints a push button in every cell of a column and reports clicks
+    by row, instead of creating a QPushButton widget per row.
+    """
+
+    clicked = pyqtSignal(int)
+
+    def __init__(self, text, parent=None):
+        super().__init__(parent)
+        self.text = text
+
+    def paint(self, painter, option, index):
+        button = QStyleOptionButton()
+        button.rect = option.rect.adjusted(4, 2, -4, -2)
+        button.text = self.text
+        button.state = QStyle.StateFlag.State_Enabled
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawControl(QStyle.ControlElement.CE_PushButton, button, painter)
+
+    def createEditor(self, parent, option, index):
+        # The cell is a button, never an editable field
+        return None
+
+    def editorEvent(self, event, model, option, index):
+        if (
+            event.type() == QEvent.Type.MouseButtonRelease
+            and event.button() == Qt.MouseButton.LeftButton
+            and option.rect.contains(event.position().toPoint())
+        ):
+            # index.row() is looked up at click time, so it is always current
+            self.clicked.emit(index.row())
+            return True
+        return False
+
+
+class ConstantTextDelegate(QStyledItemDelegate):
+    """
+    Paints the same read-only text in every cell of a column, so the
+    model needs no per-row item or value for it.
+    """
+
+    def __init__(self, text, parent=None):
+        super().__init__(parent)
+        self.text = text
+
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        option.features |= QStyleOptionViewItem.ViewItemFeature.HasDisplay
+        option.text = self.text
+
+    def createEditor(self, parent, option, index):
+        return None
+
+
 class MultiDayScheduleWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -134,14 +307,16 @@ class MultiDayScheduleWidget(QWidget):
     def setup_ui(self):
         layout = QVBoxLayout()
 
-        # Days of Week Checkboxes
+        # Days of Week Checkboxes, ID i in the group is bit i of the day mask
         days_layout = QHBoxLayout()
-        self.days_checkboxes = {}
-        days = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-        for day in days:
+        self.days_group = QButtonGroup(self)
+        self.days_group.setExclusive(False)
+        self._day_boxes = []
+        for i, day in enumerate(_DAY_NAMES):
             checkbox = QCheckBox(day)
             days_layout.addWidget(checkbox)
-            self.days_checkboxes[day] = checkbox
+            self.days_group.addButton(checkbox, i)
+            self._day_boxes.append(checkbox)
         layout.addLayout(days_layout)
 
         # Time Selection
@@ -169,6 +344,9 @@ class MultiDayScheduleWidget(QWidget):
         self.schedules_table.setHorizontalHeaderLabels(
             ["Days", "Start Time", "End Time", "Actions"]
         )
+        self.delete_delegate = ButtonDelegate("Delete", self.schedules_table)
+        self.delete_delegate.clicked.connect(self.delete_schedule)
+        self.schedules_table.setItemDelegateForColumn(3, self.delete_delegate)
         layout.addWidget(self.schedules_table)
 
         # Add Schedule Button
@@ -180,39 +358,51 @@ class MultiDayScheduleWidget(QWidget):
 
     def add_schedule(self):
         """Add a new schedule to the table and database."""
-        # Get selected days
-        selected_days = [
-            day
-            for day, checkbox in self.days_checkboxes.items()
-            if checkbox.isChecked()
-        ]
+        # Get selected days as a bitmask
+        days_mask = 0
+        for i, checkbox in enumerate(self._day_boxes):
+            days_mask |= checkbox.isChecked() << i
 
-        if not selected_days:
+        if not days_mask:
             QMessageBox.warning(self, "Invalid Input", "Please select at least one day")
             return
 
-        # Get start and end times
-        start_time = self.start_time_input.time().toString("HH:mm")
-        end_time = self.end_time_input.time().toString("HH:mm")
+        # Get start and end times as minute-of-day
+        start_min = _qtime_to_min(self.start_time_input.time())
+        end_min = _qtime_to_min(self.end_time_input.time())
 
         # Validate times
-        if start_time >= end_time:
+        if start_min >= end_min:
             QMessageBox.warning(
                 self, "Invalid Time", "Start time must be before end time"
             )
             return
 
         # Add to table
+        self.append_schedule(
+            _days_text(days_mask), _min_to_hhmm(start_min), _min_to_hhmm(end_min)
+        )
+
+    def append_schedule(self, days, start_time, end_time):
+        """Append a schedule row; its Delete button is painted by the delegate."""
         row = self.schedules_table.rowCount()
         self.schedules_table.insertRow(row)
-        self.schedules_table.setItem(row, 0, QTableWidgetItem(", ".join(selected_days)))
+        self.schedules_table.setItem(row, 0, QTableWidgetItem(days))
         self.schedules_table.setItem(row, 1, QTableWidgetItem(start_time))
         self.schedules_table.setItem(row, 2, QTableWidgetItem(end_time))
 
-        # Add delete button
-        delete_btn = QPushButton("Delete")
-        delete_btn.clicked.connect(lambda: self.delete_schedule(row))
-        self.schedules_table.setCellWidget(row, 3, delete_btn)
+    def set_schedules(self, schedules):
+        """Replace all schedule rows, sizing the table once."""
+        table = self.schedules_table
+        table.setUpdatesEnabled(False)
+        try:
+            table.setRowCount(len(schedules))
+            for row, schedule in enumerate(schedules):
+                table.setItem(row, 0, QTableWidgetItem(schedule.get("days", "")))
+                table.setItem(row, 1, QTableWidgetItem(schedule.get("start_time", "")))
+                table.setItem(row, 2, QTableWidgetItem(schedule.get("end_time", "")))
+        finally:
+            table.setUpdatesEnabled(True)
 
     def delete_schedule(self, row):
         """Delete a schedule from the table."""
@@ -233,7 +423,7 @@ class MultiDayScheduleWidget(QWidget):
     def reset(self):
         """Reset the schedule widget."""
         # Uncheck all day checkboxes
-        for checkbox in self.days_checkboxes.values():
+        for checkbox in self._day_boxes:
             checkbox.setChecked(False)
 
         # Reset time inputs to current time
@@ -249,6 +439,9 @@ class ClassManagementTab(QWidget):
     def __init__(self):
         super().__init__()
 
+        # One database handle shared by the sub-tabs and their dialogs
+        self.db = Database()
+
         # Main layout
         main_layout = QVBoxLayout()
 
@@ -256,8 +449,8 @@ class ClassManagementTab(QWidget):
         self.tab_widget = QTabWidget()
 
         # Create sub-tabs
-        self.class_list_tab = ClassListTab()
-        self.class_registration_tab = ClassRegistrationTab()
+        self.class_list_tab = ClassListTab(db=self.db)
+        self.class_registration_tab = ClassRegistrationTab(db=self.db)
 
         # Add tabs to tab widget
         self.tab_widget.addTab(self.class_list_tab, "Class List")
@@ -270,27 +463,150 @@ class ClassManagementTab(QWidget):
         self.setLayout(main_layout)
 
 
+class ClassTableModel(QAbstractTableModel):
+    """Read-only table model over the class list rows, newest first.
+
+    Rows are (class_id, name, subject, teacher, created_at); created_at is not
+    shown, but is the cursor for incremental refreshes.
+    """
+
+    HEADERS = ["Class ID", "Name", "Subject", "Teacher", "Actions"]
+    ACTIONS_COLUMN = 4
+    ACTIONS_TEXT = "View | Edit | Delete"
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._class_ids = set()
+        self.newest_created_at = None
+
+    def _track(self, rows):
+        """Record the class IDs and newest created_at of added rows."""
+        self._class_ids.update(row[0] for row in rows)
+        newest = max((row[4] for row in rows if row[4] is not None), default=None)
+        if newest is not None and (
+            self.newest_created_at is None or newest > self.newest_created_at
+        ):
+            self.newest_created_at = newest
+
+    def set_rows(self, rows):
+        """Replace the model contents with a single reset"""
+        self.beginResetModel()
+        self._rows = list(rows)
+        self._class_ids = set()
+        self.newest_created_at = None
+        self._track(self._rows)
+        self.endResetModel()
+
+    def append_rows(self, rows):
+        """Append a batch of rows with a single insert notification"""
+        if not rows:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._rows.extend(rows)
+        self._track(rows)
+        self.endInsertRows()
+
+    def prepend_rows(self, rows):
+        """Insert newer rows at the top with a single insert notification"""
+        if not rows:
+            return
+        self.beginInsertRows(QModelIndex(), 0, len(rows) - 1)
+        self._rows[:0] = rows
+        self._track(rows)
+        self.endInsertRows()
+
+    def has_class(self, class_id):
+        """Whether a row for class_id is already listed."""
+        return class_id in self._class_ids
+
+    def class_id(self, row):
+        """Class ID shown in the given row."""
+        return self._rows[row][0]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if (
+            role == Qt.ItemDataRole.DisplayRole
+            and orientation == Qt.Orientation.Horizontal
+        ):
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+
+        column = index.column()
+        if column == self.ACTIONS_COLUMN:
+            # Painted by ConstantTextDelegate
+            return None
+
+        # sqlite3 already returns typed values (name/subject/teacher are
+        # NOT NULL TEXT); Qt renders them directly, None as an empty cell
+        return self._rows[index.row()][column]
+
+    def flags(self, index):
+        return _READONLY_FLAGS
+
+
 class ClassListTab(QWidget):
-    def __init__(self):
+    # Initial widths for Class ID, Name, Subject and Teacher; Actions stretches
+    COLUMN_WIDTHS = (110, 200, 160, 160)
+
+    # Rows pulled from the cursor per fetchmany() call
+    FETCH_BATCH = 256
+
+    def __init__(self, db=None):
         super().__init__()
 
         # Database connection
-        self.db = Database()
+        self.db = db or Database()
+
+        # Details dialog, built on first use and reused afterwards
+        self._details_dialog = None
 
         # Main layout
         layout = QVBoxLayout(self)
 
-        # Class Table
-        self.class_table = QTableWidget()
-        self.class_table.setColumnCount(5)
-        self.class_table.setHorizontalHeaderLabels(
-            ["Class ID", "Name", "Subject", "Teacher", "Actions"]
+        # Class Table; the view only renders the rows that are visible
+        self.model = ClassTableModel(self)
+        self.class_table = QTableView()
+        self.class_table.setModel(self.model)
+        self.class_table.setSelectionBehavior(
+            QAbstractItemView.SelectionBehavior.SelectRows
+        )
+        # Actions placeholder text is painted by one shared delegate
+        self.actions_delegate = ConstantTextDelegate(
+            ClassTableModel.ACTIONS_TEXT, self.class_table
         )
-        self.class_table.horizontalHeader().setStretchLastSection(True)
+        self.class_table.setItemDelegateForColumn(
+            ClassTableModel.ACTIONS_COLUMN, self.actions_delegate
+        )
+        # Fixed starting widths instead of measuring every cell's text
+        header = self.class_table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        for column, width in enumerate(self.COLUMN_WIDTHS):
+            header.resizeSection(column, width)
+        header.setStretchLastSection(True)
+
+        # Refresh buttons: new classes only, or a full reload to pick up
+        # deletions and edits made elsewhere
+        refresh_layout = QHBoxLayout()
 
-        # Load Classes Button
         load_button = QPushButton("Refresh Class List")
-        load_button.clicked.connect(self.load_classes)
+        load_button.clicked.connect(self.refresh_classes)
+        refresh_layout.addWidget(load_button)
+
+        full_refresh_button = QPushButton("Full Refresh")
+        full_refresh_button.clicked.connect(self.load_classes)
+        refresh_layout.addWidget(full_refresh_button)
 
         # Action Buttons
         action_layout = QHBoxLayout()
@@ -301,7 +617,7 @@ class ClassListTab(QWidget):
         ]
 
         # Add buttons to layout
-        layout.addWidget(load_button)
+        layout.addLayout(refresh_layout)
         layout.addWidget(self.class_table)
 
         # Connect table double-click to view details
@@ -313,145 +629,86 @@ class ClassListTab(QWidget):
     def load_classes(self):
         """Load classes from the database and populate the table."""
         try:
-            # Clear existing rows
-            self.class_table.setRowCount(0)
-
-            # Execute query to fetch all classes
-            cursor = self.db.connection.cursor()
-            cursor.execute(
-                """
-                SELECT
-                    class_id,
-                    name,
-                    subject,
-                    teacher
-                FROM classes
-                ORDER BY created_at DESC
-            """
-            )
-            classes = cursor.fetchall()
-
-            # Log raw database results for debugging
-            logging.info(f"Raw classes data: {classes}")
-            logging.info(f"Number of classes retrieved: {len(classes)}")
-
-            # Populate table
-            for row, class_data in enumerate(classes):
-                # Detailed logging for each class data
-                logging.info(f"Processing class data: {class_data}")
-                logging.info(f"Class data type: {type(class_data)}")
-
-                self.class_table.insertRow(row)
-
-                # Robust data conversion with type checking and logging
-                try:
-                    # Convert to list first to ensure mutability
-                    class_data_list = list(class_data)
-
-                    # Ensure each item is a string, with type logging
-                    processed_data = []
-                    for item in class_data_list:
-                        if item is None:
-                            processed_data.append("")
-                        elif isinstance(item, (int, float)):
-                            processed_data.append(str(item))
-                        elif isinstance(item, str):
-                            processed_data.append(item)
-                        else:
-                            logging.warning(
-                                f"Unexpected data type: {type(item)} for item {item}"
-                            )
-                            processed_data.append(str(item))
+            debug = logging.getLogger().isEnabledFor(logging.DEBUG)
 
-                    # Convert to tuple for consistency
-                    class_data = tuple(processed_data)
+            # Stream classes in batches instead of materialising them all
+            cursor = self.db.connection.execute(_SQL_LIST_CLASSES)
+            self.class_table.setUpdatesEnabled(False)
+            try:
+                self.model.set_rows([])
+                while True:
+                    chunk = cursor.fetchmany(self.FETCH_BATCH)
+                    if not chunk:
+                        break
+                    # Raw rows only at DEBUG; formatting them costs O(rows)
+                    if debug:
+                        logging.debug(f"Raw classes data: {[tuple(c) for c in chunk]}")
+                    self.model.append_rows(chunk)
+            finally:
+                # Hand the statement back to the cache right away
+                cursor.close()
+                self.class_table.setUpdatesEnabled(True)
+
+            logging.info("Number of classes retrieved: %d", self.model.rowCount())
 
-                    # Logging processed data
-                    logging.info(f"Processed class data: {class_data}")
-                    logging.info(
-                        f"Processed data types: {[type(x) for x in class_data]}"
-                    )
+        except Exception as e:
+            error_message = f"Failed to load classes: {str(e)}"
+            logging.error(error_message, exc_info=True)  # Log full traceback
+            QMessageBox.critical(self, "Database Error", error_message)
 
-                except Exception as conversion_error:
-                    logging.error(f"Error converting class data: {conversion_error}")
-                    logging.error(f"Problematic data: {class_data}")
-                    continue
-
-                # Safely add items to table
-                for col, value in enumerate(class_data[:4]):  # Limit to first 4 columns
-                    item = QTableWidgetItem(str(value))
-                    item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-                    self.class_table.setItem(row, col, item)
-
-                # Actions column
-                actions_item = QTableWidgetItem("View | Edit | Delete")
-                actions_item.setFlags(
-                    actions_item.flags() & ~Qt.ItemFlag.ItemIsEditable
-                )
-                self.class_table.setItem(row, 4, actions_item)
+    def refresh_classes(self):
+        """Add classes created since the last load to the top of the table."""
+        since = self.model.newest_created_at
+        if since is None:
+            # Nothing with a timestamp listed yet to count from
+            self.load_classes()
+            return
 
-            # Resize columns to content
-            self.class_table.resizeColumnsToContents()
+        try:
+            new_rows = [
+                row
+                for row in self.db.connection.execute(_SQL_LIST_NEW_CLASSES, (since,))
+                if not self.model.has_class(row[0])
+            ]
+            self.model.prepend_rows(new_rows)
+            logging.info("Added %d new classes to the list", len(new_rows))
 
         except Exception as e:
             error_message = f"Failed to load classes: {str(e)}"
-            logging.error(error_message, exc_info=True)  # Log full traceback
+            logging.error(error_message, exc_info=True)
             QMessageBox.critical(self, "Database Error", error_message)
 
     def view_class_details(self, index=None):
         """View details of a selected class."""
         try:
             # Get selected class
-            if index is not None:
-                # If called from table row selection
-                row = index.row()
-                class_id_item = self.class_table.item(row, 0)
-            else:
+            if index is None:
                 # If called from button or other method
-                selected_items = self.class_table.selectedItems()
-                if not selected_items:
+                selected_rows = self.class_table.selectionModel().selectedRows()
+                if not selected_rows:
                     raise ValueError("No class selected")
-                class_id_item = selected_items[0]
+                index = selected_rows[0]
 
-            if not class_id_item:
+            if not index.isValid():
                 raise ValueError("No valid class ID found")
 
-            class_id = class_id_item.text()
+            class_id = str(self.model.class_id(index.row()))
             logging.info(f"Attempting to view details for class ID: {class_id}")
 
-            # Fetch full class details
-            cursor = self.db.connection.cursor()
-            cursor.execute(
-                """
-                SELECT
-                    class_id, name, subject, teacher,
-                    room, class_type, description, max_capacity
-                FROM classes
-                WHERE class_id = ?
-            """,
-                (class_id,),
-            )
-
-            class_data = cursor.fetchone()
+            # Fetch full class details and schedules in one query
+            rows = self.db.connection.execute(
+                _SQL_CLASS_DETAIL, (class_id,)
+            ).fetchall()
 
-            if not class_data:
+            if not rows:
                 logging.warning(f"No class details found for class ID: {class_id}")
                 QMessageBox.warning(
                     self, "Not Found", f"No details found for class {class_id}"
                 )
                 return
 
-            # Fetch schedules for this class
-            cursor.execute(
-                """
-                SELECT days, start_time, end_time
-                FROM class_schedules
-                WHERE class_id = ?
-            """,
-                (class_id,),
-            )
-
-            schedule_results = cursor.fetchall()
+            class_data = rows[0]
+            schedule_results = [row[8:] for row in rows if row[8] is not None]
             logging.info(
                 f"Found {len(schedule_results)} schedules for class {class_id}"
             )
@@ -477,8 +734,12 @@ class ClassListTab(QWidget):
             }
 
             # Open class details dialog
-            details_dialog = ClassDetailsDialog(class_details, self)
-            details_dialog.exec()
+            if self._details_dialog is None:
+                self._details_dialog = ClassDetailsDialog(parent=self, db=self.db)
+            self._details_dialog.load(class_details)
+            if self._details_dialog.exec() == QDialog.DialogCode.Accepted:
+                # Saved edits; new rows alone would not show them
+                self.load_classes()
 
         except Exception as e:
             error_message = f"Could not fetch class details: {str(e)}"
@@ -488,11 +749,11 @@ class ClassListTab(QWidget):
 
 
 class ClassRegistrationTab(QWidget):
-    def __init__(self):
+    def __init__(self, db=None):
         super().__init__()
 
         # Database connection
-        self.db = Database()
+        self.db = db or Database()
 
         # Main layout
         layout = QVBoxLayout(self)
@@ -563,7 +824,9 @@ class ClassRegistrationTab(QWidget):
 
     def generate_class_id(self):
         """Generate a unique class ID."""
-        unique_id = str(uuid.uuid4())[:8].upper()
+        import uuid  # only needed when registering a class
+
+        unique_id = uuid.uuid4().hex[:8].upper()
         self.class_id.setText(f"CLASS-{unique_id}")
 
         # Update schedule widget's class ID
@@ -579,22 +842,17 @@ class ClassRegistrationTab(QWidget):
             subject = self.subject.text().strip()
             teacher = self.teacher.text().strip()
 
-            # Comprehensive input validation
-            if not class_id:
-                QMessageBox.warning(self, "Validation Error", "Class ID is missing")
-                return
-
-            if not name:
-                QMessageBox.warning(self, "Validation Error", "Class name is required")
-                return
-
-            if not subject:
-                QMessageBox.warning(self, "Validation Error", "Subject is required")
-                return
-
-            if not teacher:
+            # Comprehensive input validation, reporting every missing field
+            required = {
+                "Class ID": class_id,
+                "Class name": name,
+                "Subject": subject,
+                "Teacher name": teacher,
+            }
+            missing = [field for field, value in required.items() if not value]
+            if missing:
                 QMessageBox.warning(
-                    self, "Validation Error", "Teacher name is required"
+                    self, "Validation Error", "Missing: " + ", ".join(missing)
                 )
                 return
 
@@ -610,65 +868,53 @@ class ClassRegistrationTab(QWidget):
                 "max_capacity": self.max_capacity_input.value(),
             }
 
-            # Start database transaction
             cursor = self.db.connection.cursor()
 
             try:
-                # Begin explicit transaction
-                cursor.execute("BEGIN TRANSACTION")
-
-                # Insert class details
-                cursor.execute(
-                    """
-                    INSERT INTO classes (
-                        class_id, name, subject, teacher,
-                        room, class_type, description, max_capacity,
-                        created_at, updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-                """,
-                    (
-                        class_data["class_id"],
-                        class_data["name"],
-                        class_data["subject"],
-                        class_data["teacher"],
-                        class_data["room"],
-                        class_data["class_type"],
-                        class_data["description"],
-                        class_data["max_capacity"],
-                    ),
-                )
-
-                # Get schedules
-                try:
-                    schedules = self.schedule_widget.get_schedules()
-                except ValueError as ve:
-                    # No schedules is not an error, just log it
-                    logging.info(f"No schedules to add: {ve}")
-                    schedules = []
-
-                # Insert schedules if available
-                for schedule in schedules:
-                    # Validate schedule data
-                    days = schedule.get("days", "").strip()
-                    start_time = schedule.get("start_time", "").strip()
-                    end_time = schedule.get("end_time", "").strip()
-
-                    if not days or not start_time or not end_time:
-                        logging.warning(f"Skipping invalid schedule: {schedule}")
-                        continue
-
-                    # Insert schedule
+                # Commits on success, rolls back on any exception
+                with self.db.connection:
+                    # Insert class details
                     cursor.execute(
-                        """
-                        INSERT INTO class_schedules (
-                            class_id, days, start_time, end_time
-                        ) VALUES (?, ?, ?, ?)
-                    """,
-                        (class_data["class_id"], days, start_time, end_time),
+                        _SQL_INSERT_CLASS,
+                        (
+                            class_data["class_id"],
+                            class_data["name"],
+                            class_data["subject"],
+                            class_data["teacher"],
+                            class_data["room"],
+                            class_data["class_type"],
+                            class_data["description"],
+                            class_data["max_capacity"],
+                        ),
                     )
 
-                # Commit transaction
-                self.db.connection.commit()
+                    # Get schedules
+                    try:
+                        schedules = self.schedule_widget.get_schedules()
+                    except ValueError as ve:
+                        # No schedules is not an error, just log it
+                        logging.info(f"No schedules to add: {ve}")
+                        schedules = []
+
+                    # Validate schedule data up front
+                    schedule_rows = []
+                    for schedule in schedules:
+                        days = schedule.get("days", "").strip()
+                        start_time = schedule.get("start_time", "").strip()
+                        end_time = schedule.get("end_time", "").strip()
+                        if days and start_time and end_time:
+                            schedule_rows.append(
+                                (class_data["class_id"], days, start_time, end_time)
+                            )
+
+                    skipped = len(schedules) - len(schedule_rows)
+                    if skipped:
+                        logging.warning(f"Skipping {skipped} invalid schedule(s)")
+
+                    # Insert schedules if available, in one batched statement
+                    cursor.executemany(_SQL_INSERT_SCHEDULE, schedule_rows)
+
+                self.db.notify_schedules_changed()
 
                 # Update schedule widget's class ID
                 self.schedule_widget.class_id = class_data["class_id"]
@@ -684,9 +930,6 @@ class ClassRegistrationTab(QWidget):
                 self.clear_form()
 
             except sqlite3.IntegrityError as ie:
-                # Rollback transaction on integrity error
-                self.db.connection.rollback()
-
                 # Log the specific error
                 logging.error(f"Class registration integrity error: {ie}")
 
@@ -698,9 +941,6 @@ class ClassRegistrationTab(QWidget):
                 )
 
             except Exception as inner_error:
-                # Rollback transaction on any error
-                self.db.connection.rollback()
-
                 # Log the specific error
                 logging.error(f"Class registration error: {inner_error}")
 
@@ -739,17 +979,18 @@ class ClassRegistrationTab(QWidget):
 
 
 class ClassDetailsDialog(QDialog):
-    def __init__(self, class_data=None, parent=None):
+    def __init__(self, class_data=None, parent=None, db=None):
         """
         Initialize the Class Details Dialog
 
         :param class_data: Dictionary containing existing class data
         :param parent: Parent widget
+        :param db: Shared Database instance (created if not given)
         """
         super().__init__(parent)
         self.setWindowTitle("Class Details")
         self.class_data = class_data or {}
-        self.db = Database()  # Add database connection
+        self.db = db or Database()  # Add database connection
 
         # Increase dialog size with better proportions
         self.resize(1000, 700)  # Slightly reduced height
@@ -843,6 +1084,9 @@ class ClassDetailsDialog(QDialog):
             QHeaderView.ResizeMode.Stretch
         )
         self.students_list.setMinimumHeight(200)  # Reduced height
+        self.remove_delegate = ButtonDelegate("Remove", self.students_list)
+        self.remove_delegate.clicked.connect(self.remove_student_at)
+        self.students_list.setItemDelegateForColumn(2, self.remove_delegate)
 
         # Add students button
         add_student_btn = QPushButton("Add Student")
@@ -880,12 +1124,37 @@ class ClassDetailsDialog(QDialog):
         # Add button layout to main layout
         main_layout.addLayout(button_layout)
 
+        self.load(class_data)
+
+    def load(self, class_data):
+        """
+        Fill the dialog for a class, reusing the already built widgets
+
+        :param class_data: Dictionary of existing class details
+        """
+        self.class_data = class_data or {}
+        self._class_id = ""
+        self.schedule_widget.reset()
+
         # Populate existing data if provided
         if class_data:
             self.populate_existing_data(class_data)
 
-        # Populate students list
-        self.load_enrolled_students()
+        # Students list is queried when the dialog is actually shown
+        self.students_list.setRowCount(0)
+        self._students_loaded = False
+        if self.isVisible():
+            self.ensure_students_loaded()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.ensure_students_loaded()
+
+    def ensure_students_loaded(self):
+        """Load enrolled students once per class, the first time it is shown."""
+        if not self._students_loaded:
+            self._students_loaded = True
+            self.load_enrolled_students()
 
     def populate_existing_data(self, class_data):
         """
@@ -893,8 +1162,10 @@ class ClassDetailsDialog(QDialog):
 
         :param class_data: Dictionary of existing class details
         """
-        # Set class ID (read-only for existing classes)
-        self.class_id.setText(str(class_data.get("class_id", "")))
+        # Set class ID (read-only for existing classes); the cached string
+        # is what every query binds
+        self._class_id = str(class_data.get("class_id", ""))
+        self.class_id.setText(self._class_id)
         self.class_id.setReadOnly(True)
 
         # Populate other fields
@@ -909,35 +1180,7 @@ class ClassDetailsDialog(QDialog):
         # Populate schedules
         existing_schedules = class_data.get("schedules", [])
         if existing_schedules:
-            # Reset existing schedules
-            self.schedule_widget.schedules_table.setRowCount(0)
-
-            # Add each existing schedule
-            for schedule in existing_schedules:
-                row = self.schedule_widget.schedules_table.rowCount()
-                self.schedule_widget.schedules_table.insertRow(row)
-
-                # Set days, start time, and end time
-                days = schedule.get("days", "")
-                start_time = schedule.get("start_time", "")
-                end_time = schedule.get("end_time", "")
-
-                self.schedule_widget.schedules_table.setItem(
-                    row, 0, QTableWidgetItem(days)
-                )
-                self.schedule_widget.schedules_table.setItem(
-                    row, 1, QTableWidgetItem(start_time)
-                )
-                self.schedule_widget.schedules_table.setItem(
-                    row, 2, QTableWidgetItem(end_time)
-                )
-
-                # Add delete button
-                delete_btn = QPushButton("Delete")
-                delete_btn.clicked.connect(
-                    lambda _, r=row: self.schedule_widget.delete_schedule(r)
-                )
-                self.schedule_widget.schedules_table.setCellWidget(row, 3, delete_btn)
+            self.schedule_widget.set_schedules(existing_schedules)
 
     def load_enrolled_students(self):
         """
@@ -948,36 +1191,20 @@ class ClassDetailsDialog(QDialog):
             self.students_list.setRowCount(0)
 
             # Only proceed if we have a class ID
-            if not self.class_id.text():
+            if not self._class_id:
                 return
 
             # Fetch enrolled students
-            cursor = self.db.connection.cursor()
-            cursor.execute(
-                """
-                SELECT s.student_id, s.first_name || ' ' || s.last_name as full_name
-                FROM students s
-                JOIN class_enrollments ce ON s.student_id = ce.student_id
-                WHERE ce.class_id = ?
-            """,
-                (self.class_id.text(),),
-            )
-
-            students = cursor.fetchall()
+            students = self.db.connection.execute(
+                _SQL_SELECT_ENROLLED, (self._class_id,)
+            ).fetchall()
 
-            # Populate students list
+            # Populate students list; rows are allocated in one call
+            self.students_list.setRowCount(len(students))
             for row, (student_id, full_name) in enumerate(students):
-                self.students_list.insertRow(row)
                 self.students_list.setItem(row, 0, QTableWidgetItem(student_id))
                 self.students_list.setItem(row, 1, QTableWidgetItem(full_name))
 
-                # Remove student button
-                remove_btn = QPushButton("Remove")
-                remove_btn.clicked.connect(
-                    lambda _, sid=student_id: self.remove_student(sid)
-                )
-                self.students_list.setCellWidget(row, 2, remove_btn)
-
         except sqlite3.Error as e:
             logging.error(f"Error loading enrolled students: {e}")
             QMessageBox.critical(self, "Database Error", str(e))
@@ -986,26 +1213,15 @@ class ClassDetailsDialog(QDialog):
         """Add student(s) to the class."""
         try:
             # Verify class ID exists
-            if not self.class_id.text():
+            if not self._class_id:
                 QMessageBox.warning(
                     self, "Error", "No class selected. Please select a class first."
                 )
                 return
 
-            # Get current enrolled students
-            cursor = self.db.connection.cursor()
-            cursor.execute(
-                """
-                SELECT student_id FROM class_enrollments
-                WHERE class_id = ?
-            """,
-                (self.class_id.text(),),
-            )
-            existing_students = [s[0] for s in cursor.fetchall()]
-
-            # Create selection dialog
+            # Create selection dialog; it flags already enrolled students
             dialog = StudentSelectionDialog(
-                existing_students=existing_students, parent=self
+                class_id=self._class_id, parent=self, db=self.db
             )
 
             # Execute dialog
@@ -1021,24 +1237,14 @@ class ClassDetailsDialog(QDialog):
                     )
                     return
 
-                # Enroll selected students
-                added_count = 0
-                for student_id in selected_students:
-                    try:
-                        cursor.execute(
-                            """
-                            INSERT INTO class_enrollments (student_id, class_id)
-                            VALUES (?, ?)
-                        """,
-                            (student_id, self.class_id.text()),
-                        )
-                        added_count += 1
-                    except sqlite3.IntegrityError:
-                        # Skip if student is already enrolled
-                        continue
-
-                # Commit changes
-                self.db.connection.commit()
+                # Enroll selected students in one batch; OR IGNORE skips
+                # students already enrolled, so rowcount is the number added
+                class_id = self._class_id
+                rows = [(student_id, class_id) for student_id in selected_students]
+                with self.db.connection:
+                    added_count = self.db.connection.executemany(
+                        _SQL_INSERT_ENROLLMENT, rows
+                    ).rowcount
 
                 # Refresh students list
                 self.load_enrolled_students()
@@ -1059,6 +1265,10 @@ class ClassDetailsDialog(QDialog):
             logging.error(f"Error adding student: {e}")
             QMessageBox.critical(self, "Database Error", str(e))
 
+    def remove_student_at(self, row):
+        """Remove the student shown in the given row; its button is painted."""
+        self.remove_student(self.students_list.item(row, 0).text())
+
     def remove_student(self, student_id):
         """
         Remove a student from the class
@@ -1077,13 +1287,8 @@ class ClassDetailsDialog(QDialog):
             # Proceed only if user confirms
             if reply == QMessageBox.StandardButton.Yes:
                 # Remove student from class enrollments
-                cursor = self.db.connection.cursor()
-                cursor.execute(
-                    """
-                    DELETE FROM class_enrollments
-                    WHERE student_id = ? AND class_id = ?
-                """,
-                    (student_id, self.class_id.text()),
+                self.db.connection.execute(
+                    _SQL_DELETE_ENROLLMENT, (student_id, self._class_id)
                 )
 
                 # Commit changes
@@ -1122,7 +1327,7 @@ class ClassDetailsDialog(QDialog):
 
             # Prepare class data
             class_data = {
-                "class_id": self.class_id.text().strip(),
+                "class_id": self._class_id,
                 "name": self.name.text().strip(),
                 "subject": self.subject.text().strip(),
                 "teacher": self.teacher.text().strip(),
@@ -1133,64 +1338,50 @@ class ClassDetailsDialog(QDialog):
                 "schedules": self.schedule_widget.get_schedules(),
             }
 
-            # Start database transaction
-            cursor = self.db.connection.cursor()
-            cursor.execute("BEGIN TRANSACTION")
-
-            # Update class details
-            cursor.execute(
-                """
-                UPDATE classes
-                SET
-                    name = ?,
-                    subject = ?,
-                    teacher = ?,
-                    room = ?,
-                    class_type = ?,
-                    description = ?,
-                    max_capacity = ?,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE class_id = ?
-            """,
+            class_id = class_data["class_id"]
+            schedule_rows = Counter(
                 (
-                    class_data["name"],
-                    class_data["subject"],
-                    class_data["teacher"],
-                    class_data["room"],
-                    class_data["class_type"],
-                    class_data["description"],
-                    class_data["max_capacity"],
-                    class_data["class_id"],
-                ),
+                    class_id,
+                    schedule.get("days", ""),
+                    schedule.get("start_time", ""),
+                    schedule.get("end_time", ""),
+                )
+                for schedule in class_data["schedules"]
             )
 
-            # Remove existing schedules
-            cursor.execute(
-                """
-                DELETE FROM class_schedules
-                WHERE class_id = ?
-            """,
-                (class_data["class_id"],),
-            )
+            connection = self.db.connection
 
-            # Insert new schedules
-            for schedule in class_data["schedules"]:
-                cursor.execute(
-                    """
-                    INSERT INTO class_schedules (
-                        class_id, days, start_time, end_time
-                    ) VALUES (?, ?, ?, ?)
-                """,
+            # Commits on success, rolls back on any exception
+            with connection:
+                # Update class details
+                connection.execute(
+                    _SQL_UPDATE_CLASS,
                     (
-                        class_data["class_id"],
-                        schedule.get("days", ""),
-                        schedule.get("start_time", ""),
-                        schedule.get("end_time", ""),
+                        class_data["name"],
+                        class_data["subject"],
+                        class_data["teacher"],
+                        class_data["room"],
+                        class_data["class_type"],
+                        class_data["description"],
+                        class_data["max_capacity"],
+                        class_id,
                     ),
                 )
 
-            # Commit transaction
-            self.db.connection.commit()
+                # Only write the schedules that changed. Each edited schedule
+                # keeps one matching stored row, so duplicates are removed one
+                # at a time; stored rows left unmatched are deleted by id
+                removed_ids = []
+                for row in connection.execute(_SQL_SELECT_SCHEDULES, (class_id,)):
+                    schedule = tuple(row)[1:]
+                    if schedule_rows[schedule]:
+                        schedule_rows[schedule] -= 1
+                    else:
+                        removed_ids.append((row[0],))
+                connection.executemany(_SQL_DELETE_SCHEDULE, removed_ids)
+                connection.executemany(_SQL_INSERT_SCHEDULE, schedule_rows.elements())
+
+            self.db.notify_schedules_changed()
 
             # Close dialog
             QMessageBox.information(
@@ -1199,20 +1390,175 @@ class ClassDetailsDialog(QDialog):
             self.accept()
 
         except sqlite3.Error as e:
-            # Rollback transaction
-            self.db.connection.rollback()
-
             logging.error(f"Error saving class details: {e}")
             QMessageBox.critical(self, "Database Error", str(e))
 
 
+class StudentFilterProxyModel(QSortFilterProxyModel):
+    """
+    Filters the student selection rows by the search text (matched against
+    ID, name and email) and by gender.
+
+    The source model returns the lowercase ID, name and email, joined by
+    newlines, under SEARCH_ROLE on the ID column. It is built once at load
+    time, so a keystroke is a single substring match per row.
+    """
+
+    SEARCH_ROLE = Qt.ItemDataRole.UserRole + 1
+    SEARCH_COLUMN = 1
+    GENDER_COLUMN = 4
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFilterRole(self.SEARCH_ROLE)
+        self.setFilterKeyColumn(self.SEARCH_COLUMN)
+        self._gender = None
+
+    @staticmethod
+    def search_text(student_id, full_name, email):
+        """Precomputed lowercase text the search term is matched against"""
+        return f"{student_id}\n{full_name}\n{email}".lower()
+
+    def set_search(self, text):
+        """Match rows whose ID, name or email contains text, ignoring case"""
+        self.setFilterFixedString(text.lower())
+
+    def set_gender(self, gender):
+        """Only accept rows with this gender; "All Genders" accepts every row"""
+        self._gender = None if gender == "All Genders" else gender
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        model = self.sourceModel()
+        if (
+            self._gender is not None
+            and model.index(source_row, self.GENDER_COLUMN, source_parent).data()
+            != self._gender
+        ):
+            return False
+
+        # Fixed-string match against the precomputed SEARCH_ROLE text
+        return super().filterAcceptsRow(source_row, source_parent)
+
+
+class StudentsModel(QAbstractTableModel):
+    """
+    Students offered for enrollment, held as the raw
+    (student_id, full_name, email, gender, enrolled) rows from the database.
+
+    Column 0 is a checkbox; checked student IDs are kept in a set, so no
+    per-row items or widgets exist and the view only asks for visible cells.
+    """
+
+    HEADERS = ["", "Student ID", "Name", "Email", "Gender"]
+    ENROLLED = 4
+
+    _CHECKABLE_FLAGS = _READONLY_FLAGS | Qt.ItemFlag.ItemIsUserCheckable
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._search = []
+        self.checked = set()
+
+    def set_rows(self, rows):
+        """Replace the model contents with a single reset"""
+        self.beginResetModel()
+        self._rows = list(rows)
+        # Lowercase search text, computed once instead of per keystroke
+        self._search = [
+            StudentFilterProxyModel.search_text(*row[:3]) for row in self._rows
+        ]
+        self.checked = set()
+        self.endResetModel()
+
+    def set_all_checked(self, checked):
+        """Check every student not yet enrolled, or clear all checks"""
+        self.checked = (
+            {row[0] for row in self._rows if not row[self.ENROLLED]}
+            if checked
+            else set()
+        )
+        if self._rows:
+            self.dataChanged.emit(
+                self.index(0, 0),
+                self.index(len(self._rows) - 1, 0),
+                [Qt.ItemDataRole.CheckStateRole],
+            )
+
+    def checked_ids(self):
+        """Checked student IDs, in table order"""
+        return [row[0] for row in self._rows if row[0] in self.checked]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if (
+            role == Qt.ItemDataRole.DisplayRole
+            and orientation == Qt.Orientation.Horizontal
+        ):
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row = self._rows[index.row()]
+        column = index.column()
+        if column == 0:
+            if role == Qt.ItemDataRole.CheckStateRole:
+                return (
+                    Qt.CheckState.Checked
+                    if row[0] in self.checked
+                    else Qt.CheckState.Unchecked
+                )
+            if role == Qt.ItemDataRole.ToolTipRole and row[self.ENROLLED]:
+                return "Already in class"
+            return None
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return row[column - 1]
+        if (
+            role == StudentFilterProxyModel.SEARCH_ROLE
+            and column == StudentFilterProxyModel.SEARCH_COLUMN
+        ):
+            return self._search[index.row()]
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if role != Qt.ItemDataRole.CheckStateRole or index.column() != 0:
+            return False
+
+        student_id = self._rows[index.row()][0]
+        if Qt.CheckState(value) == Qt.CheckState.Checked:
+            self.checked.add(student_id)
+        else:
+            self.checked.discard(student_id)
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+    def flags(self, index):
+        if index.column() != 0:
+            return _READONLY_FLAGS
+        # Students already in the class get a disabled checkbox
+        if self._rows[index.row()][self.ENROLLED]:
+            return Qt.ItemFlag.NoItemFlags
+        return self._CHECKABLE_FLAGS
+
+
 class StudentSelectionDialog(QDialog):
-    def __init__(self, existing_students=None, parent=None):
+    def __init__(self, class_id=None, parent=None, db=None):
         """
         Dialog for selecting multiple students to add to a class.
 
-        :param existing_students: List of students already in the class
+        :param class_id: ID of the class; its enrolled students are disabled
         :param parent: Parent widget
+        :param db: Shared Database instance (created if not given)
         """
         super().__init__(parent)
         self.setWindowTitle("Add Students to Class")
@@ -1222,10 +1568,10 @@ class StudentSelectionDialog(QDialog):
         main_layout = QVBoxLayout(self)
 
         # Database connection
-        self.db = Database()
+        self.db = db or Database()
 
-        # Existing students to exclude
-        self.existing_students = existing_students or []
+        # Class whose enrolled students are shown as already added
+        self.class_id = class_id
 
         # Search and filter section
         search_layout = QHBoxLayout()
@@ -1246,11 +1592,15 @@ class StudentSelectionDialog(QDialog):
 
         main_layout.addLayout(search_layout)
 
-        # Students table with checkboxes
-        self.students_table = QTableWidget()
-        self.students_table.setColumnCount(5)
-        self.students_table.setHorizontalHeaderLabels(
-            ["", "Student ID", "Name", "Email", "Gender"]
+        # Students table with checkboxes; filtering runs in the proxy model
+        self.students_model = StudentsModel(self)
+        self.students_proxy = StudentFilterProxyModel(self)
+        self.students_proxy.setSourceModel(self.students_model)
+
+        self.students_table = QTableView()
+        self.students_table.setModel(self.students_proxy)
+        self.students_table.setEditTriggers(
+            QAbstractItemView.EditTrigger.NoEditTriggers
         )
 
         # Make first column a checkbox
@@ -1289,79 +1639,22 @@ class StudentSelectionDialog(QDialog):
 
     def load_students(self):
         """Load all students into the table."""
-        # Get all students
-        students = self.db.get_students()
-
-        # Set table rows
-        self.students_table.setRowCount(len(students))
-
-        for row, student in enumerate(students):
-            # Checkbox column
-            checkbox = QCheckBox()
-            checkbox_widget = QWidget()
-            checkbox_layout = QHBoxLayout(checkbox_widget)
-            checkbox_layout.addWidget(checkbox)
-            checkbox_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            checkbox_layout.setContentsMargins(0, 0, 0, 0)
-            self.students_table.setCellWidget(row, 0, checkbox_widget)
-
-            # Disable checkbox for existing students
-            student_id = student.get("student_id", "")
-            if student_id in self.existing_students:
-                checkbox.setEnabled(False)
-                checkbox.setToolTip("Already in class")
-
-            # Student ID
-            self.students_table.setItem(row, 1, QTableWidgetItem(student_id))
-
-            # Name
-            full_name = (
-                student.get("name")
-                or f"{student.get('first_name', '')} {student.get('last_name', '')}".strip()
-            )
-            self.students_table.setItem(row, 2, QTableWidgetItem(full_name))
+        # Get all students with their enrollment flag in one query
+        students = self.db.get_students_with_enrollment(self.class_id)
 
-            # Email
-            self.students_table.setItem(
-                row, 3, QTableWidgetItem(student.get("email", ""))
-            )
-
-            # Gender
-            self.students_table.setItem(
-                row, 4, QTableWidgetItem(student.get("gender", ""))
-            )
+        # Rows are only rendered as the view scrolls to them
+        self.students_model.set_rows(students)
 
     def filter_students(self):
         """Filter students based on search and gender."""
-        search_term = self.search_input.text().lower()
-        gender_filter = self.gender_filter.currentText()
-
-        for row in range(self.students_table.rowCount()):
-            # Get row data
-            student_id = self.students_table.item(row, 1).text().lower()
-            name = self.students_table.item(row, 2).text().lower()
-            email = self.students_table.item(row, 3).text().lower()
-            gender = self.students_table.item(row, 4).text()
-
-            # Check search conditions
-            search_match = (
-                search_term in student_id or search_term in name or search_term in email
-            )
-
-            # Check gender filter
-            gender_match = gender_filter == "All Genders" or gender_filter == gender
-
-            # Show/hide row
-            self.students_table.setRowHidden(row, not (search_match and gender_match))
+        self.students_proxy.set_gender(self.gender_filter.currentText())
+        self.students_proxy.set_search(self.search_input.text())
 
     def toggle_all_students(self, state):
         """Toggle selection of all students."""
-        for row in range(self.students_table.rowCount()):
-            checkbox_widget = self.students_table.cellWidget(row, 0)
-            if checkbox_widget:
-                checkbox = checkbox_widget.findChild(QCheckBox)
-                if checkbox and checkbox.isEnabled():
-                    checkbox.setChecked(state == Qt.CheckState.Checked)
+        self.students_model.set_all_checked(
+            Qt.CheckState(state) == Qt.CheckState.Checked
+        )
 
     def get_selected_students(self):
         """
@@ -1369,12 +1662,4 @@ class StudentSelectionDialog(QDialog):
 
         :return: List of selected student IDs
         """
-        selected_students = []
-        for row in range(self.students_table.rowCount()):
-            checkbox_widget = self.students_table.cellWidget(row, 0)
-            if checkbox_widget:
-                checkbox = checkbox_widget.findChild(QCheckBox)
-                if checkbox and checkbox.isChecked():
-                    student_id = self.students_table.item(row, 1).text()
-                    selected_students.append(student_id)
-        return selected_students
+        return self.students_model.checked_ids()
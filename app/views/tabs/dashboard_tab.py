@@ -10,11 +10,81 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont, QIcon
 
+# Shared Arial fonts keyed by (point size, bold); QFont needs a running
+# QApplication, so they are created on first use rather than at import
+_FONTS = {}
+
+
+def _font(size, bold=False):
+    """Return the cached Arial QFont for a point size and weight."""
+    font = _FONTS.get((size, bold))
+    if font is None:
+        font = _FONTS[size, bold] = (
+            QFont("Arial", size, QFont.Weight.Bold) if bold else QFont("Arial", size)
+        )
+    return font
+
+
+# Dashboard stylesheet, built once at import instead of per DashboardTab
+_DASHBOARD_QSS = """
+    QFrame {
+        background-color: white;
+        border-radius: 10px;
+        padding: 15px;
+    }
+    #welcomeFrame {
+        background-color: #1a73e8;
+        color: white;
+    }
+    #actionsFrame {
+        background-color: #f8f9fa;
+    }
+    QPushButton {
+        background-color: #fff;
+        border: 2px solid #1a73e8;
+        border-radius: 5px;
+        padding: 10px;
+        color: #1a73e8;
+    }
+    QPushButton:hover {
+        background-color: #1a73e8;
+        color: white;
+    }
+    .status-indicator {
+        padding: 10px;
+        border-radius: 5px;
+        background-color: #e8f0fe;
+    }
+"""
+
 
 class DashboardTab(QWidget):
+    # (title, description) of each quick action button
+    QUICK_ACTIONS = (
+        ("Register Student", "Add new students to the system"),
+        ("Manage Classes", "Create and modify class schedules"),
+        ("Take Attendance", "Start attendance tracking"),
+        ("Monitor Behavior", "Begin classroom monitoring"),
+    )
+
+    # (title, status) of each system status indicator
+    STATUS_ITEMS = (
+        ("Database", "Connected"),
+        ("Camera", "Ready"),
+        ("AI Models", "Loaded"),
+        ("Storage", "Available"),
+    )
+
     def __init__(self):
         super().__init__()
-        self.init_ui()
+
+        # Build every section before the first layout pass
+        self.setUpdatesEnabled(False)
+        try:
+            self.init_ui()
+        finally:
+            self.setUpdatesEnabled(True)
+        self.updateGeometry()
 
     def init_ui(self):
         """Initialize the dashboard UI."""
@@ -28,11 +98,11 @@ class DashboardTab(QWidget):
         welcome_layout = QVBoxLayout(welcome_frame)
 
         title = QLabel("Welcome to Edison Class Vision")
-        title.setFont(QFont("Arial", 24, QFont.Weight.Bold))
+        title.setFont(_font(24, bold=True))
         welcome_layout.addWidget(title)
 
         subtitle = QLabel("Intelligent Classroom Management System")
-        subtitle.setFont(QFont("Arial", 14))
+        subtitle.setFont(_font(14))
         welcome_layout.addWidget(subtitle)
 
         layout.addWidget(welcome_frame)
@@ -43,14 +113,7 @@ class DashboardTab(QWidget):
         actions_layout = QHBoxLayout(actions_frame)
 
         # Create quick action buttons
-        quick_actions = [
-            ("Register Student", "Add new students to the system"),
-            ("Manage Classes", "Create and modify class schedules"),
-            ("Take Attendance", "Start attendance tracking"),
-            ("Monitor Behavior", "Begin classroom monitoring"),
-        ]
-
-        for title, description in quick_actions:
+        for title, description in self.QUICK_ACTIONS:
             action_widget = self.create_action_button(title, description)
             actions_layout.addWidget(action_widget)
 
@@ -62,19 +125,12 @@ class DashboardTab(QWidget):
         status_layout = QVBoxLayout(status_frame)
 
         status_title = QLabel("System Status")
-        status_title.setFont(QFont("Arial", 16, QFont.Weight.Bold))
+        status_title.setFont(_font(16, bold=True))
         status_layout.addWidget(status_title)
 
         # Add status indicators
         status_grid = QHBoxLayout()
-        status_items = [
-            ("Database", "Connected"),
-            ("Camera", "Ready"),
-            ("AI Models", "Loaded"),
-            ("Storage", "Available"),
-        ]
-
-        for title, status in status_items:
+        for title, status in self.STATUS_ITEMS:
             status_widget = self.create_status_indicator(title, status)
             status_grid.addWidget(status_widget)
 
@@ -87,7 +143,7 @@ class DashboardTab(QWidget):
         instructions_layout = QVBoxLayout(instructions_frame)
 
         instructions_title = QLabel("Quick Start Guide")
-        instructions_title.setFont(QFont("Arial", 16, QFont.Weight.Bold))
+        instructions_title.setFont(_font(16, bold=True))
         instructions_layout.addWidget(instructions_title)
 
         instructions_text = """
@@ -99,44 +155,13 @@ class DashboardTab(QWidget):
         """
 
         instructions = QLabel(instructions_text)
-        instructions.setFont(QFont("Arial", 12))
+        instructions.setFont(_font(12))
         instructions_layout.addWidget(instructions)
 
         layout.addWidget(instructions_frame)
 
         # Set styles
-        self.setStyleSheet(
-            """
-            QFrame {
-                background-color: white;
-                border-radius: 10px;
-                padding: 15px;
-            }
-            #welcomeFrame {
-                background-color: #1a73e8;
-                color: white;
-            }
-            #actionsFrame {
-                background-color: #f8f9fa;
-            }
-            QPushButton {
-                background-color: #fff;
-                border: 2px solid #1a73e8;
-                border-radius: 5px;
-                padding: 10px;
-                color: #1a73e8;
-            }
-            QPushButton:hover {
-                background-color: #1a73e8;
-                color: white;
-            }
-            .status-indicator {
-                padding: 10px;
-                border-radius: 5px;
-                background-color: #e8f0fe;
-            }
-        """
-        )
+        self.setStyleSheet(_DASHBOARD_QSS)
 
     def create_action_button(self, title, description):
         """Create a quick action button widget."""
@@ -144,11 +169,11 @@ class DashboardTab(QWidget):
         layout = QVBoxLayout(widget)
 
         button = QPushButton(title)
-        button.setFont(QFont("Arial", 12))
+        button.setFont(_font(12))
         button.setMinimumSize(150, 40)
 
         desc = QLabel(description)
-        desc.setFont(QFont("Arial", 10))
+        desc.setFont(_font(10))
         desc.setWordWrap(True)
 
         layout.addWidget(button)
@@ -164,10 +189,10 @@ class DashboardTab(QWidget):
         layout = QVBoxLayout(widget)
 
         title_label = QLabel(title)
-        title_label.setFont(QFont("Arial", 12, QFont.Weight.Bold))
+        title_label.setFont(_font(12, bold=True))
 
         status_label = QLabel(status)
-        status_label.setFont(QFont("Arial", 10))
+        status_label.setFont(_font(10))
 
         layout.addWidget(title_label)
         layout.addWidget(status_label)
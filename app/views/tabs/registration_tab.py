@@ -3,6 +3,8 @@ import sys
 import logging
 import sqlite3
 import pickle
+import threading
+import uuid
 import cv2
 import json
 import numpy as np
@@ -30,13 +32,335 @@ from PyQt6.QtWidgets import (
     QHeaderView,
     QGridLayout,
     QGroupBox,
+    QApplication,
 )
-from PyQt6.QtCore import Qt, QDate, QTimer, QSize, QEvent
-from PyQt6.QtGui import QImage, QPixmap, QFont, QIcon, QColor
+from PyQt6.QtCore import (
+    Qt,
+    QDate,
+    QTimer,
+    QSize,
+    QEvent,
+    QThread,
+    QRunnable,
+    QThreadPool,
+    QRect,
+    pyqtSignal,
+)
+from PyQt6.QtGui import QImage, QPixmap, QFont, QIcon, QColor, QPainter
+from PyQt6.QtOpenGLWidgets import QOpenGLWidget
 
 from app.models.database import Database
-from app.utils.config import DATA_DIR, ICONS_DIR, DATABASE_PATH
-from app.utils.face_recognition import FaceRecognitionManager
+from app.utils.config import DATA_DIR, ICONS_DIR, DATABASE_PATH, MODELS_DIR
+from app.utils.face_recognition import FaceRecognitionManager, encode_face_image
+
+# OpenCV's bundled frontal face Haar cascade
+FACE_CASCADE_PATH = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+
+
+def _draw_faces(image, faces, scale=1.0):
+    """Draw a green rectangle on image for each (x, y, w, h) face, scaled."""
+    if len(faces) == 0:
+        return
+    boxes = np.rint(np.asarray(faces) * scale).astype(int)
+    corners = boxes[:, :2]
+    for pt1, pt2 in zip(corners.tolist(), (corners + boxes[:, 2:]).tolist()):
+        cv2.rectangle(image, pt1, pt2, (0, 255, 0), 2)
+
+
+class FaceNetDetector:
+    """OpenCV DNN (ResNet-SSD) face detector.
+
+    The Caffe model files are optional; without them in MODELS_DIR the tabs
+    fall back to the Haar cascade. One network is shared by the GUI and the
+    camera worker, so forward passes are serialized with a lock.
+    """
+
+    PROTOTXT = MODELS_DIR / "deploy.prototxt"
+    WEIGHTS = MODELS_DIR / "res10_300x300_ssd_iter_140000.caffemodel"
+    INPUT_SIZE = (300, 300)
+    MEAN = (104.0, 177.0, 123.0)
+    CONFIDENCE = 0.5
+
+    # Shared instance, or None once the model turned out to be unavailable
+    _shared = ...
+
+    def __init__(self, net):
+        self.net = net
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls):
+        """Return the shared detector, or None if the model cannot be loaded."""
+        if cls._shared is ...:
+            cls._shared = cls.load()
+        return cls._shared
+
+    @classmethod
+    def load(cls):
+        """Load the Caffe model from MODELS_DIR, or return None."""
+        if not (cls.PROTOTXT.exists() and cls.WEIGHTS.exists()):
+            logging.info("DNN face model not found, using Haar cascade")
+            return None
+        try:
+            net = cv2.dnn.readNetFromCaffe(str(cls.PROTOTXT), str(cls.WEIGHTS))
+        except cv2.error as e:
+            logging.warning(f"Could not load DNN face model: {e}")
+            return None
+        net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        return cls(net)
+
+    def detect(self, frame, min_size=0):
+        """Return (x, y, w, h) face rectangles in frame coordinates."""
+        h, w = frame.shape[:2]
+        blob = cv2.dnn.blobFromImage(
+            cv2.resize(frame, self.INPUT_SIZE), 1.0, self.INPUT_SIZE, self.MEAN
+        )
+        with self._lock:
+            self.net.setInput(blob)
+            detections = self.net.forward()[0, 0]
+
+        # Rows are (image, label, confidence, x1, y1, x2, y2), corners relative
+        bounds = np.array((w, h, w, h))
+        confident = detections[detections[:, 2] > self.CONFIDENCE]
+        boxes = np.clip(confident[:, 3:7] * bounds, 0, bounds).astype(int)
+        boxes[:, 2:] -= boxes[:, :2]
+        boxes = boxes[(boxes[:, 2] >= min_size) & (boxes[:, 3] >= min_size)]
+        return boxes if len(boxes) else ()
+
+
+# Encoder settings for captured face images
+JPEG_PARAMS = [cv2.IMWRITE_JPEG_QUALITY, 90, cv2.IMWRITE_JPEG_OPTIMIZE, 1]
+
+
+class ImwriteTask(QRunnable):
+    """Encodes and saves an image on the global thread pool."""
+
+    def __init__(self, path, image, params=()):
+        super().__init__()
+        self.path = path
+        self.image = image
+        self.params = list(params)
+
+    def run(self):
+        if not cv2.imwrite(self.path, self.image, self.params):
+            logging.error(f"Failed to save captured face: {self.path}")
+
+
+class FaceEncodingTask(QRunnable):
+    """Computes a registered student's face encoding on the global thread pool."""
+
+    def __init__(self, student_id, face_image_path, encoded):
+        super().__init__()
+        self.student_id = student_id
+        self.face_image_path = face_image_path
+        # Bound signal emitted with (student_id, encoding bytes, path, mtime);
+        # the database is only written from the receiving (GUI) thread
+        self.encoded = encoded
+
+    def run(self):
+        try:
+            encoding, mtime = encode_face_image(self.face_image_path)
+        except Exception as e:
+            logging.error(f"Error encoding face for student {self.student_id}: {e}")
+            return
+
+        if encoding is None:
+            logging.warning(f"No face found in {self.face_image_path}")
+            return
+        self.encoded.emit(
+            self.student_id, encoding.tobytes(), self.face_image_path, mtime
+        )
+
+
+class CameraPreview(QOpenGLWidget):
+    """Camera preview drawn through OpenGL.
+
+    Frames are painted with QPainter on the GL surface, which uploads them as
+    a texture and scales on the GPU, instead of going through a QPixmap and
+    the raster engine. Without a frame it shows a line of text, like a QLabel.
+    """
+
+    def __init__(self, text="", parent=None):
+        super().__init__(parent)
+        self._image = None
+        self._text = text
+
+    def setImage(self, image):
+        """Show a QImage; its pixel data must stay alive until the next call."""
+        self._image = image
+        self.update()
+
+    def setText(self, text):
+        self._image = None
+        self._text = text
+        self.update()
+
+    def clear(self):
+        self.setText("")
+
+    def paintGL(self):
+        painter = QPainter(self)
+        rect = self.rect()
+        painter.fillRect(rect, self.palette().window())
+
+        if self._image is not None:
+            # Fit the frame inside the widget, keeping its aspect ratio
+            size = self._image.size().scaled(
+                rect.size(), Qt.AspectRatioMode.KeepAspectRatio
+            )
+            target = QRect(rect.topLeft(), size)
+            target.moveCenter(rect.center())
+            painter.drawImage(target, self._image)
+        else:
+            painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, self._text)
+
+        painter.setPen(Qt.GlobalColor.black)
+        painter.drawRect(rect.adjusted(0, 0, -1, -1))
+        painter.end()
+
+
+class CameraWorker(QThread):
+    """Reads the camera and runs face detection off the GUI thread.
+
+    Every frame is grabbed so the driver queue stays short; every
+    retrieve_every-th is decoded and emitted as BGR together with the face
+    rectangles, which are re-detected every detect_every-th frame. The DNN
+    detector is used when face_net is given, the Haar cascade otherwise.
+    """
+
+    # Detection runs on a copy downscaled to this width
+    DETECT_WIDTH = 320
+
+    frameReady = pyqtSignal(object, object)
+    readFailed = pyqtSignal()
+
+    def __init__(
+        self,
+        capture,
+        face_cascade,
+        retrieve_every=2,
+        detect_every=6,
+        face_net=None,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.capture = capture
+        self.face_cascade = face_cascade
+        self.face_net = face_net
+        self.retrieve_every = retrieve_every
+        self.detect_every = detect_every
+        self._stop_event = threading.Event()
+
+    def run(self):
+        self._stop_event.clear()
+        tick = 0
+        faces = ()
+
+        while not self._stop_event.is_set():
+            # grab() blocks until the next frame, which paces the loop
+            if not self.capture.grab():
+                self.readFailed.emit()
+                return
+            tick += 1
+            if tick % self.retrieve_every:
+                continue
+
+            ret, frame = self.capture.retrieve()
+            if not ret:
+                self.readFailed.emit()
+                return
+
+            # Detect faces on some frames; the others reuse the last result
+            if tick % self.detect_every == 0:
+                faces = self.detect_faces(frame)
+
+            self.frameReady.emit(frame, faces)
+
+    def detect_faces(self, frame):
+        """Detect faces on a downscaled copy, in full-frame coordinates."""
+        if self.face_net is not None:
+            # The network resizes to its own input size
+            return self.face_net.detect(frame)
+
+        height, width = frame.shape[:2]
+        scale = width / self.DETECT_WIDTH
+        small = cv2.resize(
+            frame,
+            (self.DETECT_WIDTH, round(height / scale)),
+            interpolation=cv2.INTER_AREA,
+        )
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+        # minSize is 30x30 at full resolution
+        found = self.face_cascade.detectMultiScale(
+            gray,
+            scaleFactor=1.1,
+            minNeighbors=5,
+            minSize=(round(30 / scale), round(30 / scale)),
+        )
+        if len(found) == 0:
+            return ()
+        return (found * scale).astype(int)
+
+    def stop(self):
+        self._stop_event.set()
+        self.wait()
+
+
+def _collect_student(form):
+    """Read a registration form's fields into a student dict.
+
+    Shared by RegistrationTab and StudentRegistrationForm, whose input widgets
+    have the same names. Returns None, after telling the user why, when a
+    required field is empty or they decline to continue without a face image.
+    """
+    student_id = form.student_id_input.text().strip()
+    first_name = form.first_name_input.text().strip()
+    last_name = form.last_name_input.text().strip()
+    email = form.email_input.text().strip()
+    phone = form.phone_input.text().strip()
+    date_of_birth = form.date_of_birth_input.date().toString("yyyy-MM-dd")
+    gender = form.gender_input.currentText()
+
+    # Validate required fields, stopping at the first missing one
+    for field_name, value in (
+        ("First name", first_name),
+        ("Last name", last_name),
+        ("Email", email),
+        ("Phone number", phone),
+        ("Gender", gender),
+    ):
+        if not value:
+            QMessageBox.warning(form, "Validation Error", f"{field_name} is required")
+            return None
+
+    # Check for face image
+    face_image_path = getattr(form, "captured_image", None) or ""
+    if not face_image_path:
+        reply = QMessageBox.question(
+            form,
+            "Missing Face Image",
+            "No face image captured. Do you want to proceed without a face image?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+        )
+        if reply == QMessageBox.StandardButton.No:
+            return None
+
+    # Set default student ID if none provided
+    if not student_id:
+        student_id = f"STU-{str(uuid.uuid4())[:8].upper()}"
+
+    return {
+        "student_id": student_id,
+        "first_name": first_name,
+        "last_name": last_name,
+        "email": email,
+        "phone": phone,
+        "date_of_birth": date_of_birth,
+        "gender": gender,
+        "face_image_path": face_image_path,
+    }
 
 
 class StudentDetailDialog(QDialog):
@@ -82,6 +406,9 @@ class StudentDetailDialog(QDialog):
 
 
 class StudentRegistrationForm(QWidget):
+    # Every timer tick grabs a frame; only every RETRIEVE_EVERY-th is decoded
+    RETRIEVE_EVERY = 2
+
     def __init__(self, database, parent=None):
         super().__init__(parent)
         self.database = database
@@ -95,13 +422,21 @@ class StudentRegistrationForm(QWidget):
         self.video_capture = None
         self.face_image_path = None
 
-        # Initialize face cascade
-        self.face_cascade = cv2.CascadeClassifier(
-            cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-        )
+        # Where captured faces are saved, created once up front
+        self._face_dir = os.path.join(DATA_DIR, "student_faces")
+        os.makedirs(self._face_dir, exist_ok=True)
+
+        # Face detectors: the DNN model when available, Haar otherwise
+        self.face_net = FaceNetDetector.shared()
+        self.face_cascade = cv2.CascadeClassifier(FACE_CASCADE_PATH)
 
         self.init_ui()
 
+        # The webcam stays open between captures; release it on exit
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.release_camera)
+
     def init_ui(self):
         # Main layout
         main_layout = QVBoxLayout()
@@ -174,21 +509,25 @@ class StudentRegistrationForm(QWidget):
         Start face capture process using webcam
         """
         try:
-            # Open webcam
-            self.video_capture = cv2.VideoCapture(0)
+            # Open the webcam on first use and keep it for later retakes
+            if self.video_capture is None:
+                self.video_capture = cv2.VideoCapture(0)
+                self.video_capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
 
             if not self.video_capture.isOpened():
+                self.release_camera()
                 QMessageBox.warning(self, "Error", "Could not open webcam")
                 return
 
-            # Verify face cascade is loaded
-            if self.face_cascade.empty():
+            # Verify a face detector is loaded
+            if self.face_net is None and self.face_cascade.empty():
                 QMessageBox.warning(
                     self, "Error", "Face detection classifier failed to load"
                 )
                 return
 
             # Start timer to update face capture
+            self._tick = 0
             self.capture_timer.start(50)  # 50 ms interval
             self.capture_button.setEnabled(False)
             self.capture_button.setText("Capturing...")
@@ -207,28 +546,34 @@ class StudentRegistrationForm(QWidget):
                 self.stop_face_capture()
                 return
 
-            # Capture frame
-            ret, frame = self.video_capture.read()
+            # Grab every frame so the driver queue stays short, but only
+            # decode the ones that are previewed and searched for a face
+            ret = self.video_capture.grab()
+            if ret:
+                self._tick += 1
+                if self._tick % self.RETRIEVE_EVERY:
+                    return
+                ret, frame = self.video_capture.retrieve()
 
             if not ret:
                 QMessageBox.warning(self, "Camera Error", "Could not read camera frame")
                 self.stop_face_capture()
                 return
 
-            # Convert frame to grayscale for face detection
-            gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-
             # Detect faces
-            faces = self.face_cascade.detectMultiScale(
-                gray_frame, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30)
-            )
+            if self.face_net is not None:
+                faces = self.face_net.detect(frame, min_size=30)
+            else:
+                gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                faces = self.face_cascade.detectMultiScale(
+                    gray_frame, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30)
+                )
 
             # Convert frame to RGB for display
             rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
 
             # Draw rectangles around faces
-            for x, y, w, h in faces:
-                cv2.rectangle(rgb_frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+            _draw_faces(rgb_frame, faces)
 
             # Convert to QImage
             h, w, ch = rgb_frame.shape
@@ -255,102 +600,43 @@ class StudentRegistrationForm(QWidget):
         """
         Stop face capture and save the image
         """
-        # Stop timer
+        # Stop timer; the webcam stays open for the next capture
         self.capture_timer.stop()
 
-        # Release webcam
-        if self.video_capture:
-            self.video_capture.release()
-            self.video_capture = None
-
         # Reset button
         self.capture_button.setEnabled(True)
         self.capture_button.setText("Capture Face")
 
         # Save face image
         if frame is not None:
-            # Create directory if not exists
-            os.makedirs(os.path.join(DATA_DIR, "student_faces"), exist_ok=True)
-
             # Generate unique filename
             student_id = self.student_id_input.text()
             self.face_image_path = os.path.join(
-                DATA_DIR, "student_faces", f"{student_id}_face.jpg"
+                self._face_dir, f"{student_id}_face.jpg"
             )
 
             # Save image
-            cv2.imwrite(self.face_image_path, frame)
+            cv2.imwrite(self.face_image_path, frame, JPEG_PARAMS)
+
+    def release_camera(self):
+        """Release the webcam kept open between captures."""
+        self.capture_timer.stop()
+        if self.video_capture is not None:
+            self.video_capture.release()
+            self.video_capture = None
+
+    def closeEvent(self, event):
+        self.release_camera()
+        super().closeEvent(event)
 
     def register_student(self):
         """Register a new student."""
         try:
-            # Get form data
-            student_id = self.student_id_input.text().strip()
-
-            # Get name information
-            first_name = self.first_name_input.text().strip()
-            last_name = self.last_name_input.text().strip()
-
-            email = self.email_input.text().strip()
-            phone = self.phone_input.text().strip()
-            date_of_birth = self.date_of_birth_input.date().toString("yyyy-MM-dd")
-            gender = self.gender_input.currentText()
-
-            # Validate required fields
-            if not first_name:
-                QMessageBox.warning(self, "Validation Error", "First name is required")
+            # Read and validate the form
+            student_dict = _collect_student(self)
+            if student_dict is None:
                 return
 
-            if not last_name:
-                QMessageBox.warning(self, "Validation Error", "Last name is required")
-                return
-
-            if not email:
-                QMessageBox.warning(self, "Validation Error", "Email is required")
-                return
-
-            if not phone:
-                QMessageBox.warning(
-                    self, "Validation Error", "Phone number is required"
-                )
-                return
-
-            if not gender:
-                QMessageBox.warning(self, "Validation Error", "Gender is required")
-                return
-
-            # Check for face image
-            face_image_path = ""
-            if hasattr(self, "captured_image") and self.captured_image:
-                face_image_path = self.captured_image
-            else:
-                reply = QMessageBox.question(
-                    self,
-                    "Missing Face Image",
-                    "No face image captured. Do you want to proceed without a face image?",
-                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-                )
-                if reply == QMessageBox.StandardButton.No:
-                    return
-
-            # Set default student ID if none provided
-            if not student_id:
-                import uuid
-
-                student_id = f"STU-{str(uuid.uuid4())[:8].upper()}"
-
-            # Gather student information
-            student_dict = {
-                "student_id": student_id,
-                "first_name": first_name,
-                "last_name": last_name,
-                "email": email,
-                "phone": phone,
-                "date_of_birth": date_of_birth,
-                "gender": gender,
-                "face_image_path": face_image_path,
-            }
-
             # Use the database method to add student
             try:
                 new_student_id = self.db.add_student(student_dict)
@@ -365,7 +651,8 @@ class StudentRegistrationForm(QWidget):
                 QMessageBox.information(
                     self,
                     "Success",
-                    f"Student {first_name} {last_name} registered successfully!",
+                    f"Student {student_dict['first_name']} "
+                    f"{student_dict['last_name']} registered successfully!",
                 )
             except Exception as db_error:
                 QMessageBox.warning(
@@ -394,6 +681,17 @@ class StudentRegistrationForm(QWidget):
 
 
 class RegistrationTab(QWidget):
+    # The camera worker decodes every RETRIEVE_EVERY-th frame for the preview
+    # and runs face detection on every DETECT_EVERY-th
+    RETRIEVE_EVERY = 2
+    DETECT_EVERY = 6
+
+    # Size of the camera preview label
+    PREVIEW_SIZE = (320, 240)
+
+    # Emitted from the thread pool with a registered student's face encoding
+    face_encoded = pyqtSignal(str, bytes, str, float)
+
     def __init__(self, parent=None):
         """Initialize the registration tab."""
         super().__init__(parent)
@@ -401,21 +699,43 @@ class RegistrationTab(QWidget):
         # Database and logging
         self.db = Database()
 
-        # Initialize face cascade
-        self.face_cascade = cv2.CascadeClassifier(
-            cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-        )
+        # Face detectors: the DNN model when available, Haar otherwise
+        self.face_net = FaceNetDetector.shared()
+        self.face_cascade = cv2.CascadeClassifier(FACE_CASCADE_PATH)
 
-        if self.face_cascade.empty():
+        if self.face_net is None and self.face_cascade.empty():
             logging.error("Failed to load face detection classifier")
             QMessageBox.critical(
                 self, "Error", "Face detection classifier failed to load"
             )
 
+        # Camera read loop, running while the camera is on
+        self.camera_worker = None
+        self._last_frame = None
+
+        # Preview pixels are resized into one reused buffer; the QImage over
+        # it is kept so its backing bytes outlive the paint
+        self._preview_buf = np.empty(
+            (self.PREVIEW_SIZE[1], self.PREVIEW_SIZE[0], 3), dtype=np.uint8
+        )
+        self._last_qimage = None
+
+        # Where captured faces are saved, created once up front
+        self._capture_dir = Path(DATA_DIR) / "student_captures"
+        self._capture_dir.mkdir(parents=True, exist_ok=True)
+
+        # Face encodings computed at registration are stored from this thread
+        self.face_encoded.connect(self.db.save_face_encoding)
+
         # Initialize UI
         self.init_ui()
         self.load_students_table()
 
+        # Stop the worker thread before the application tears widgets down
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.stop_camera)
+
     def init_ui(self):
         """Initialize the student registration UI."""
         main_layout = QHBoxLayout(self)
@@ -459,9 +779,8 @@ class RegistrationTab(QWidget):
         face_layout = QVBoxLayout(face_section)
 
         # Camera View
-        self.camera_label = QLabel("Camera Feed")
+        self.camera_label = CameraPreview("Camera Feed")
         self.camera_label.setFixedSize(320, 240)
-        self.camera_label.setStyleSheet("border: 1px solid black;")
 
         # Camera Control Buttons
         camera_button_layout = QHBoxLayout()
@@ -546,10 +865,6 @@ class RegistrationTab(QWidget):
         main_layout.addWidget(face_section, 1)
         main_layout.addWidget(right_column, 2)
 
-        # Setup camera timer
-        self.camera_timer = QTimer(self)
-        self.camera_timer.timeout.connect(self.update_camera_frame)
-
         # Start camera
         self.start_camera()
 
@@ -585,8 +900,29 @@ class RegistrationTab(QWidget):
             self.capture.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
             self.capture.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
 
-            # Start timer to update camera feed
-            self.camera_timer.start(30)  # 30 ms interval
+            # Keep a single queued frame so the preview never lags behind,
+            # and pace the driver to about 30 frames a second
+            if not self.capture.set(cv2.CAP_PROP_BUFFERSIZE, 1):
+                logging.warning("Camera backend ignored CAP_PROP_BUFFERSIZE")
+            self.capture.set(cv2.CAP_PROP_FPS, 30)
+
+            # Read frames and detect faces on a worker thread
+            # The worker gets its own classifier: CascadeClassifier is not
+            # thread-safe, and capture_face uses self.face_cascade on this thread
+            worker_cascade = None
+            if self.face_net is None:
+                worker_cascade = cv2.CascadeClassifier(FACE_CASCADE_PATH)
+            self.camera_worker = CameraWorker(
+                self.capture,
+                worker_cascade,
+                retrieve_every=self.RETRIEVE_EVERY,
+                detect_every=self.DETECT_EVERY,
+                face_net=self.face_net,
+                parent=self,
+            )
+            self.camera_worker.frameReady.connect(self.update_camera_frame)
+            self.camera_worker.readFailed.connect(self.on_camera_read_failed)
+            self.camera_worker.start()
 
             # Update camera state
             self.is_camera_running = True
@@ -612,8 +948,12 @@ class RegistrationTab(QWidget):
     def stop_camera(self):
         """Stop the camera."""
         try:
-            # Stop timer
-            self.camera_timer.stop()
+            # Stop the worker before releasing the camera it reads from
+            if self.camera_worker:
+                self.camera_worker.stop()
+                self.camera_worker = None
+            self._last_frame = None
+            self._last_qimage = None
 
             # Release camera
             if hasattr(self, "capture"):
@@ -635,46 +975,45 @@ class RegistrationTab(QWidget):
                 self, "Camera Error", f"Could not stop camera: {str(e)}"
             )
 
-    def update_camera_frame(self):
-        """Update camera frame in the UI with face detection."""
-        try:
-            ret, frame = self.capture.read()
+    def on_camera_read_failed(self):
+        """Stop the camera when the worker can no longer read frames."""
+        self.stop_camera()
+        QMessageBox.warning(self, "Camera Error", "Could not read camera frame")
 
-            if not ret:
-                # If frame reading fails, stop the camera
-                self.stop_camera()
-                QMessageBox.warning(self, "Camera Error", "Could not read camera frame")
-                return
-
-            # Convert frame to grayscale for face detection
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    def update_camera_frame(self, frame, faces):
+        """Show a frame from the camera worker with its detected faces."""
+        if self.camera_worker is None:
+            # Queued from a worker that has since been stopped
+            return
 
-            # Detect faces
-            faces = self.face_cascade.detectMultiScale(
-                gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30)
+        try:
+            # Kept unmodified for capture_face
+            self._last_frame = frame
+
+            # Downscale to the label in OpenCV, keeping the aspect ratio;
+            # Qt then shows the preview as is
+            h, w = frame.shape[:2]
+            scale = min(self.PREVIEW_SIZE[0] / w, self.PREVIEW_SIZE[1] / h)
+            size = (round(w * scale), round(h * scale))
+            if self._preview_buf.shape[:2] != size[::-1]:
+                # Only when the camera's aspect ratio differs from the label's
+                self._preview_buf = np.empty((size[1], size[0], 3), dtype=np.uint8)
+            preview = cv2.resize(
+                frame, size, dst=self._preview_buf, interpolation=cv2.INTER_LINEAR
             )
 
-            # Draw rectangles around detected faces
-            for x, y, w, h in faces:
-                cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+            # Draw rectangles around detected faces on the preview, so the
+            # frame itself stays clean
+            _draw_faces(preview, faces, scale)
 
-            # Convert frame to RGB for display
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-            # Convert to QImage
-            h, w, ch = rgb_frame.shape
-            bytes_per_line = ch * w
-            qt_image = QImage(
-                rgb_frame.data, w, h, bytes_per_line, QImage.Format.Format_RGB888
-            )
-
-            # Scale image to fit label
-            scaled_image = qt_image.scaled(
-                self.camera_label.size(), Qt.AspectRatioMode.KeepAspectRatio
+            # Wrap the BGR preview directly; no RGB conversion pass
+            ph, pw = preview.shape[:2]
+            self._last_qimage = QImage(
+                preview.data, pw, ph, preview.strides[0], QImage.Format.Format_BGR888
             )
 
             # Set image
-            self.camera_label.setPixmap(QPixmap.fromImage(scaled_image))
+            self.camera_label.setImage(self._last_qimage)
 
             # Update face count overlay
             face_count_text = f"Faces Detected: {len(faces)}"
@@ -698,19 +1037,21 @@ class RegistrationTab(QWidget):
     def capture_face(self):
         """Capture face from camera."""
         try:
-            ret, frame = self.capture.read()
+            # Latest frame from the worker; the camera itself belongs to it
+            frame = self._last_frame
 
-            if not ret:
+            if frame is None:
                 QMessageBox.warning(self, "Camera Error", "Could not read camera frame")
                 return
 
-            # Convert frame to grayscale for face detection
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-
-            # Detect faces
-            faces = self.face_cascade.detectMultiScale(
-                gray, scaleFactor=1.1, minNeighbors=5, minSize=(100, 100)
-            )
+            # Detect faces at full resolution
+            if self.face_net is not None:
+                faces = self.face_net.detect(frame, min_size=100)
+            else:
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                faces = self.face_cascade.detectMultiScale(
+                    gray, scaleFactor=1.1, minNeighbors=5, minSize=(100, 100)
+                )
 
             if len(faces) == 0:
                 QMessageBox.warning(
@@ -730,12 +1071,8 @@ class RegistrationTab(QWidget):
             # Get the first (and only) face
             (x, y, w, h) = faces[0]
 
-            # Extract face region with some margin
-            face_img = frame[y : y + h, x : x + w]
-
-            # Create capture directory if it doesn't exist
-            capture_dir = Path(DATA_DIR) / "student_captures"
-            capture_dir.mkdir(parents=True, exist_ok=True)
+            # Extract face region; a contiguous copy the pool task can own
+            face_img = frame[y : y + h, x : x + w].copy()
 
             # Generate unique filename
             current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -743,14 +1080,17 @@ class RegistrationTab(QWidget):
             # Use student ID if available, otherwise use timestamp
             student_id = self.student_id_input.text().strip()
             if student_id:
-                filename = f"{student_id}_{current_time}.png"
+                filename = f"{student_id}_{current_time}.jpg"
             else:
-                filename = f"face_capture_{current_time}.png"
+                filename = f"face_capture_{current_time}.jpg"
 
-            capture_path = capture_dir / filename
+            capture_path = self._capture_dir / filename
 
-            # Save image
-            cv2.imwrite(str(capture_path), face_img)
+            # Save image in the background; only the path is needed until
+            # the student is registered
+            QThreadPool.globalInstance().start(
+                ImwriteTask(str(capture_path), face_img, JPEG_PARAMS)
+            )
 
             # Store the path for later use in registration
             self.captured_image = str(capture_path)
@@ -758,8 +1098,12 @@ class RegistrationTab(QWidget):
             # Log successful capture
             logging.info(f"Face captured successfully: {self.captured_image}")
 
-            # Show captured face in a dialog
-            captured_pixmap = QPixmap(str(capture_path))
+            # Show captured face in a dialog, from memory rather than the file
+            fh, fw = face_img.shape[:2]
+            face_qimage = QImage(
+                face_img.data, fw, fh, face_img.strides[0], QImage.Format.Format_BGR888
+            )
+            captured_pixmap = QPixmap.fromImage(face_qimage)
             captured_dialog = QDialog(self)
             captured_dialog.setWindowTitle("Captured Face")
             dialog_layout = QVBoxLayout(captured_dialog)
@@ -791,76 +1135,25 @@ class RegistrationTab(QWidget):
     def register_student(self):
         """Register a new student."""
         try:
-            # Get form data
-            student_id = self.student_id_input.text().strip()
-
-            # Get name information
-            first_name = self.first_name_input.text().strip()
-            last_name = self.last_name_input.text().strip()
-
-            email = self.email_input.text().strip()
-            phone = self.phone_input.text().strip()
-            date_of_birth = self.date_of_birth_input.date().toString("yyyy-MM-dd")
-            gender = self.gender_input.currentText()
-
-            # Validate required fields
-            if not first_name:
-                QMessageBox.warning(self, "Validation Error", "First name is required")
-                return
-
-            if not last_name:
-                QMessageBox.warning(self, "Validation Error", "Last name is required")
-                return
-
-            if not email:
-                QMessageBox.warning(self, "Validation Error", "Email is required")
-                return
-
-            if not phone:
-                QMessageBox.warning(
-                    self, "Validation Error", "Phone number is required"
-                )
+            # Read and validate the form
+            student_dict = _collect_student(self)
+            if student_dict is None:
                 return
 
-            if not gender:
-                QMessageBox.warning(self, "Validation Error", "Gender is required")
-                return
-
-            # Check for face image
-            face_image_path = ""
-            if hasattr(self, "captured_image") and self.captured_image:
-                face_image_path = self.captured_image
-            else:
-                reply = QMessageBox.question(
-                    self,
-                    "Missing Face Image",
-                    "No face image captured. Do you want to proceed without a face image?",
-                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-                )
-                if reply == QMessageBox.StandardButton.No:
-                    return
-
-            # Set default student ID if none provided
-            if not student_id:
-                import uuid
-
-                student_id = f"STU-{str(uuid.uuid4())[:8].upper()}"
-
-            # Gather student information
-            student_dict = {
-                "student_id": student_id,
-                "first_name": first_name,
-                "last_name": last_name,
-                "email": email,
-                "phone": phone,
-                "date_of_birth": date_of_birth,
-                "gender": gender,
-                "face_image_path": face_image_path,
-            }
-
             # Use the database method to add student
             new_student_id = self.db.add_student(student_dict)
 
+            # Encode the face now, off the UI thread, so check-in can load it
+            # instead of encoding every new student when the camera starts
+            if student_dict["face_image_path"]:
+                QThreadPool.globalInstance().start(
+                    FaceEncodingTask(
+                        new_student_id,
+                        student_dict["face_image_path"],
+                        self.face_encoded,
+                    )
+                )
+
             # Reset form after successful registration
             self.clear_form()
 
@@ -871,7 +1164,8 @@ class RegistrationTab(QWidget):
             QMessageBox.information(
                 self,
                 "Success",
-                f"Student {first_name} {last_name} registered successfully!",
+                f"Student {student_dict['first_name']} "
+                f"{student_dict['last_name']} registered successfully!",
             )
 
         except Exception as e:
@@ -880,15 +1174,23 @@ class RegistrationTab(QWidget):
 
     def load_students_table(self):
         """Load students from database into the table."""
+        table = self.students_table
+        sorting = table.isSortingEnabled()
         try:
-            # Clear existing rows
-            self.students_table.setRowCount(0)
-
             # Connect to database
             students = self.db.get_students()
 
+            # Fill the pre-sized table with sorting, repaints and signals
+            # off, so rows are laid out once at the end
+            table.setSortingEnabled(False)
+            table.setUpdatesEnabled(False)
+            table.blockSignals(True)
+
+            # Clear existing rows
+            table.setRowCount(0)
+
             # Populate table
-            self.students_table.setRowCount(len(students))
+            table.setRowCount(len(students))
             for row, student in enumerate(students):
                 # Combine first and last name if name is not present
                 full_name = (
@@ -938,6 +1240,10 @@ class RegistrationTab(QWidget):
             QMessageBox.critical(
                 self, "Database Error", f"Could not load students: {str(e)}"
             )
+        finally:
+            table.blockSignals(False)
+            table.setUpdatesEnabled(True)
+            table.setSortingEnabled(sorting)
 
     def edit_student(self, row):
         """Edit a student's details."""